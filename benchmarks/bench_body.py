@@ -0,0 +1,166 @@
+"""
+Measures the cost of sending a large request body with the clients
+generated with each --mode, against the body encoding of the previous
+template (json= with model_dump or msgspec.to_builtins).
+
+    python benchmarks/bench_body.py --items 50000 --repeat 5
+
+The transport returns a prebuilt response, so the timings are dominated
+by the encoding of the body. The typeddict mode sends dicts with json= in
+both templates and is timed for reference.
+"""
+
+import argparse
+import importlib
+import json
+import subprocess
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import httpx
+from common import generate, time_calls
+
+MODES = ["typeddict", "pydantic", "msgspec"]
+
+SPEC = {
+    "openapi": "3.1.0",
+    "info": {"title": "Benchmark", "version": "1"},
+    "paths": {
+        "/items": {
+            "post": {
+                "operationId": "create_items",
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/ItemBatch"}
+                        }
+                    }
+                },
+                "responses": {"204": {"description": "No Content"}},
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "ItemBatch": {
+                "type": "object",
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/Item"},
+                    }
+                },
+                "required": ["items"],
+            },
+            "Item": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "name": {"type": "string"},
+                    "price": {"type": "number"},
+                    "active": {"type": "boolean"},
+                    "tags": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["id", "name", "price", "active", "tags"],
+            },
+        }
+    },
+}
+
+
+def make_items(items: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "name": f"item-{i}",
+            "price": i * 1.5,
+            "active": i % 2 == 0,
+            "tags": ["a", "b", "c"],
+        }
+        for i in range(items)
+    ]
+
+
+def legacy_create_items(mode: str) -> Callable[..., Any]:
+    """
+    Returns create_items as rendered by the previous template
+    """
+
+    def dump(model: Any) -> Any:
+        if mode == "pydantic":
+            return model.model_dump(exclude_unset=True)
+        if mode == "msgspec":
+            import msgspec
+
+            return msgspec.to_builtins(model)
+        return model
+
+    def create_items(
+        self: httpx.Client, body: Any, **kwargs: Any
+    ) -> tuple[httpx.Response, Any]:
+        res = self.request("post", "/items", json=dump(body), **kwargs)
+        res.raise_for_status()
+        return res, None
+
+    return create_items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    size = len(json.dumps({"items": items}, separators=(",", ":")))
+    print(f"body: {size / 1e6:.1f} MB, {args.items} items")
+    transport = httpx.MockTransport(lambda _: httpx.Response(204))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        spec_path = tmp_dir / "spec.json"
+        spec_path.write_text(json.dumps(SPEC))
+        sys.path.insert(0, str(tmp_dir))
+        for mode in MODES:
+            try:
+                generate(spec_path, tmp_dir / f"client_{mode}", mode)
+                module = importlib.import_module(f"client_{mode}.client")
+                requests = importlib.import_module(f"client_{mode}.requests")
+            except (ImportError, subprocess.CalledProcessError) as e:
+                print(f"{mode:>10}: skipped ({e})")
+                continue
+
+            body: Any = {"items": items}
+            if mode == "pydantic":
+                body = requests.ItemBatch.model_validate(body)
+            elif mode == "msgspec":
+                import msgspec
+
+                body = msgspec.convert(body, requests.ItemBatch)
+
+            client = module.APIClient(base_url="http://bench", transport=transport)
+            legacy_cls = type("LegacyClient", (module.APIClient,), {})
+            legacy_cls.create_items = legacy_create_items(mode)
+            legacy = legacy_cls(base_url="http://bench", transport=transport)
+            assert json.loads(client.create_items(body)[0].request.content) == (
+                json.loads(legacy.create_items(body)[0].request.content)
+            )
+
+            before, after = time_calls(
+                [
+                    lambda legacy=legacy, body=body: legacy.create_items(body),
+                    lambda client=client, body=body: client.create_items(body),
+                ],
+                args.repeat,
+            )
+            print(
+                f"{mode:>10}: previous {before * 1000:.1f} ms,"
+                f" current {after * 1000:.1f} ms ({before / after:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Times every stage of client generation on a synthetic spec and writes the
+results to a JSON file, so runs can be compared across versions.
+
+    python benchmarks/bench_generate.py --paths 1000 --schemas 2000 \
+        --output results.json
+
+Each stage is timed --repeat times on a freshly validated spec, with the
+cache of rendered schemas cleared, and the best time is reported. Peak
+memory is measured in a separate run with tracemalloc, which would
+otherwise slow down the timings.
+
+The parsing stages fill the schema IR of the spec, which the render
+stages reuse, so both are reported separately: the render times do not
+include resolving the schemas.
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Literal
+
+from synthetic import add_arguments, spec_from_args
+
+from oas_client import __version__
+from oas_client.generator import get_model, render_runtime
+from oas_client.graph import get_schema_graph
+from oas_client.index import get_operation_index
+from oas_client.openapi import OpenAPI
+from oas_client.parser import (
+    find_functions,
+    find_parameters,
+    find_schemas,
+    traverse_path_methods_get,
+)
+from oas_client.renderers.client import render_client
+from oas_client.renderers.params import render_params
+from oas_client.renderers.queries import render_queries
+from oas_client.renderers.requests import render_requests
+from oas_client.renderers.responses import render_responses
+from oas_client.renderers.schemas import render_schema
+from oas_client.types import PaginationConfig
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "oas_client" / "templates"
+
+Mode = Literal["typeddict", "pydantic", "msgspec"]
+
+
+def run_stages(
+    spec_text: str, mode: Mode, measure: Callable[[str, Callable[[], Any]], Any]
+) -> dict[str, str]:
+    """
+    Runs the generation stages in order through measure and returns the
+    rendered modules
+    """
+    model_to_use, class_to_use, imports = get_model(mode)
+    pagination = PaginationConfig()
+
+    spec_json = measure("json_load", lambda: json.loads(spec_text))
+    spec: OpenAPI = measure("validate", lambda: OpenAPI(**spec_json))
+    measure("operation_index", lambda: get_operation_index(spec))
+    measure("schema_graph", lambda: get_schema_graph(spec))
+    measure("find_schemas", lambda: find_schemas(spec, class_to_use))
+    measure(
+        "find_schemas_partial", lambda: find_schemas(spec, class_to_use, partial=True)
+    )
+    measure("find_parameters_path", lambda: find_parameters(spec, "path", class_to_use))
+    measure(
+        "find_parameters_query", lambda: find_parameters(spec, "query", class_to_use)
+    )
+    measure("find_functions", lambda: find_functions(spec, pagination))
+    measure("traverse_requests", lambda: traverse_path_methods_get(spec, "requests"))
+    measure("traverse_responses", lambda: traverse_path_methods_get(spec, "response"))
+    return {
+        "responses.py": measure(
+            "render_responses",
+            lambda: render_responses(spec, TEMPLATE_DIR, imports, class_to_use),
+        ),
+        "requests.py": measure(
+            "render_requests",
+            lambda: render_requests(spec, TEMPLATE_DIR, imports, class_to_use),
+        ),
+        "queries.py": measure(
+            "render_queries",
+            lambda: render_queries(spec, TEMPLATE_DIR, imports, class_to_use),
+        ),
+        "params.py": measure(
+            "render_params",
+            lambda: render_params(spec, TEMPLATE_DIR, imports, class_to_use),
+        ),
+        "client.py": measure(
+            "render_client",
+            lambda: render_client(spec, TEMPLATE_DIR, model_to_use, pagination),
+        ),
+        # static modules imported by the client
+        **render_runtime(TEMPLATE_DIR),
+    }
+
+
+def time_stages(spec_text: str, mode: Mode, repeat: int) -> dict[str, float]:
+    timings: dict[str, float] = {}
+
+    def measure(name: str, func: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        timings[name] = min(timings.get(name, elapsed), elapsed)
+        return result
+
+    for _ in range(repeat):
+        # schemas rendered by a previous run would be cache hits
+        render_schema.cache_clear()
+        run_stages(spec_text, mode, measure)
+    return timings
+
+
+def trace_stages(spec_text: str, mode: Mode) -> tuple[dict[str, int], dict[str, str]]:
+    peaks: dict[str, int] = {}
+
+    def measure(name: str, func: Callable[[], Any]) -> Any:
+        tracemalloc.reset_peak()
+        result = func()
+        peaks[name] = tracemalloc.get_traced_memory()[1]
+        return result
+
+    render_schema.cache_clear()
+    tracemalloc.start()
+    try:
+        modules = run_stages(spec_text, mode, measure)
+    finally:
+        tracemalloc.stop()
+    return peaks, modules
+
+
+def write_client(output_dir: Path, modules: dict[str, str]):
+    output_dir.mkdir(parents=True)
+    (output_dir / "__init__.py").write_text("")
+    for name, code in modules.items():
+        (output_dir / name).write_text(code)
+
+
+def time_formatting(output_dir: Path) -> float | None:
+    if shutil.which("ruff") is None:
+        return None
+    start = time.perf_counter()
+    subprocess.run(["ruff", "format", output_dir], capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def time_import(package_dir: Path) -> float:
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import client.client\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    res = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=package_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(res.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    parser.add_argument(
+        "--mode", default="typeddict", choices=["typeddict", "pydantic", "msgspec"]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Path of the JSON results file.")
+    args = parser.parse_args()
+
+    spec_text = json.dumps(spec_from_args(args))
+    stage_timings = time_stages(spec_text, args.mode, args.repeat)
+    render_stages = [name for name in stage_timings if name.startswith("render_")]
+    parse_stages = [name for name in stage_timings if name not in render_stages]
+    # formatting is skipped without ruff
+    timings: dict[str, float | None] = dict(stage_timings)
+    peaks, modules = trace_stages(spec_text, args.mode)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp) / "client"
+        write_client(output_dir, modules)
+        timings["formatting"] = time_formatting(output_dir)
+        import_seconds = time_import(Path(tmp))
+        generated_bytes = sum(f.stat().st_size for f in output_dir.glob("*.py"))
+
+    results = {
+        "oas_client_version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            k: v for k, v in vars(args).items() if k not in {"output", "repeat"}
+        },
+        "spec_bytes": len(spec_text),
+        "stages": {
+            name: {"seconds": timings.get(name), "peak_bytes": peaks.get(name)}
+            for name in timings
+        },
+        "parse_seconds": sum(stage_timings[name] for name in parse_stages),
+        "render_seconds": sum(stage_timings[name] for name in render_stages),
+        "total_seconds": sum(t for t in timings.values() if t is not None),
+        "generated_bytes": generated_bytes,
+        "import_seconds": import_seconds,
+    }
+
+    sections = [
+        ("parsing, fills the schema IR", parse_stages, results["parse_seconds"]),
+        ("rendering, from the schema IR", render_stages, results["render_seconds"]),
+        ("formatting", ["formatting"], None),
+    ]
+    for title, names, total in sections:
+        print(title)
+        for name in names:
+            stage = results["stages"][name]
+            seconds = stage["seconds"]
+            peak = stage["peak_bytes"]
+            print(
+                f"{name:>22}: "
+                + (
+                    f"{seconds * 1000:10.1f} ms"
+                    if seconds is not None
+                    else "   skipped"
+                )
+                + (f" {peak / 1e6:10.1f} MB peak" if peak is not None else "")
+            )
+        if total is not None:
+            print(f"{'total':>22}: {total * 1000:10.1f} ms")
+    print(f"{'client import':>22}: {import_seconds * 1000:10.1f} ms")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
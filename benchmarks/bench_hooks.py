@@ -0,0 +1,106 @@
+"""
+Measures the per-call overhead of the operation extensions and of the
+hooks of the generated client, against a method sending the same request
+without them.
+
+    python benchmarks/bench_hooks.py --calls 20000
+
+The transport returns a prebuilt response, so the differences between the
+timings are the cost of the extensions and of the hooks.
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import httpx
+from common import generate, time_calls
+
+SPEC = {
+    "openapi": "3.1.0",
+    "info": {"title": "Benchmark", "version": "1"},
+    "paths": {
+        "/items/{item_id}": {
+            "get": {
+                "operationId": "get_item",
+                "parameters": [
+                    {
+                        "name": "item_id",
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    }
+                ],
+                "responses": {"200": {"description": "OK"}},
+            }
+        }
+    },
+}
+
+
+def bare_get_item(
+    self: httpx.Client, params: Any, **kwargs: Any
+) -> tuple[httpx.Response, Any]:
+    """
+    get_item without the operation extensions
+    """
+    res = self.request("get", f"/items/{params['item_id']}", **kwargs)
+    res.raise_for_status()
+    return res, res.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    response = httpx.Response(200, content=b"{}")
+    transport = httpx.MockTransport(lambda _: response)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        spec_path = tmp_dir / "spec.json"
+        spec_path.write_text(json.dumps(SPEC))
+        sys.path.insert(0, str(tmp_dir))
+        generate(spec_path, tmp_dir / "client_hooks")
+        module = importlib.import_module("client_hooks.client")
+        hooks = importlib.import_module("client_hooks.hooks")
+
+        # the send of httpx, without the hook dispatch of the client
+        bare_cls = type(
+            "BareClient",
+            (module.APIClient,),
+            {"send": httpx.Client.send, "get_item": bare_get_item},
+        )
+        bare = bare_cls(base_url="http://bench", transport=transport)
+        client = module.APIClient(base_url="http://bench", transport=transport)
+        stats = module.APIClient(
+            base_url="http://bench",
+            transport=transport,
+            hooks=[hooks.OperationStats()],
+        )
+        params = {"item_id": 42}
+        timings = time_calls(
+            [
+                lambda: bare.get_item(params),
+                lambda: client.get_item(params),
+                lambda: stats.get_item(params),
+            ],
+            args.repeat,
+            args.calls,
+        )
+        base = timings[0]
+        for name, timing in zip(["bare", "no hooks", "stats hook"], timings):
+            print(
+                f"{name:>10}: {timing * 1e6:.1f} us/call"
+                f" ({(timing - base) * 1e6:+.1f} us)"
+            )
+
+
+if __name__ == "__main__":
+    main()
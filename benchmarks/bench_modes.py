@@ -0,0 +1,119 @@
+"""
+Compares response decoding of the clients generated with each --mode on a
+large list payload.
+
+    python benchmarks/bench_modes.py --items 100000 --repeat 5
+
+The msgspec mode requires msgspec to be installed.
+"""
+
+import argparse
+import importlib
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from common import generate
+
+MODES = ["typeddict", "pydantic", "msgspec"]
+
+SPEC = {
+    "openapi": "3.1.0",
+    "info": {"title": "Benchmark", "version": "1"},
+    "paths": {
+        "/items": {
+            "get": {
+                "operationId": "list_items",
+                "responses": {
+                    "200": {
+                        "description": "OK",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "array",
+                                    "items": {"$ref": "#/components/schemas/Item"},
+                                }
+                            }
+                        },
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Item": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "name": {"type": "string"},
+                    "price": {"type": "number"},
+                    "active": {"type": "boolean"},
+                    "tags": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["id", "name", "price", "active", "tags"],
+            }
+        }
+    },
+}
+
+
+def make_payload(items: int) -> bytes:
+    return json.dumps(
+        [
+            {
+                "id": i,
+                "name": f"item-{i}",
+                "price": i * 1.5,
+                "active": i % 2 == 0,
+                "tags": ["a", "b", "c"],
+            }
+            for i in range(items)
+        ]
+    ).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = make_payload(args.items)
+    transport = httpx.MockTransport(
+        lambda _: httpx.Response(
+            200, content=payload, headers={"Content-Type": "application/json"}
+        )
+    )
+    print(f"payload: {len(payload) / 1e6:.1f} MB, {args.items} items")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        spec_path = tmp_dir / "spec.json"
+        spec_path.write_text(json.dumps(SPEC))
+        sys.path.insert(0, str(tmp_dir))
+        for mode in MODES:
+            try:
+                generate(spec_path, tmp_dir / f"client_{mode}", mode)
+                module = importlib.import_module(f"client_{mode}.client")
+            except (ImportError, subprocess.CalledProcessError) as e:
+                print(f"{mode:>10}: skipped ({e})")
+                continue
+            client = module.APIClient(base_url="http://bench", transport=transport)
+            timings: list[float] = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                client.list_items()
+                timings.append(time.perf_counter() - start)
+            print(
+                f"{mode:>10}: best {min(timings) * 1000:.1f} ms,"
+                f" mean {sum(timings) / len(timings) * 1000:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
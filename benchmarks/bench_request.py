@@ -0,0 +1,147 @@
+"""
+Measures the per-call overhead of building a request with path and query
+parameters in the clients generated with each --mode, against the request
+building of the previous template (url.format, urlencode and model_dump).
+
+    python benchmarks/bench_request.py --calls 20000
+
+The transport returns a prebuilt response, so the difference between the
+two timings is the cost of building the request.
+"""
+
+import argparse
+import importlib
+import json
+import subprocess
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+import httpx
+from common import generate, time_calls
+
+MODES = ["typeddict", "pydantic", "msgspec"]
+
+SPEC = {
+    "openapi": "3.1.0",
+    "info": {"title": "Benchmark", "version": "1"},
+    "paths": {
+        "/stores/{store_id}/items/{item_id}": {
+            "get": {
+                "operationId": "get_item",
+                "parameters": [
+                    {
+                        "name": name,
+                        "in": "path",
+                        "required": True,
+                        "schema": {"type": "integer"},
+                    }
+                    for name in ["store_id", "item_id"]
+                ]
+                + [
+                    {"name": name, "in": "query", "schema": {"type": type_}}
+                    for name, type_ in [
+                        ("fields", "string"),
+                        ("expand", "string"),
+                        ("limit", "integer"),
+                        ("offset", "integer"),
+                    ]
+                ],
+                "responses": {"200": {"description": "OK"}},
+            }
+        }
+    },
+}
+
+
+def legacy_get_item(mode: str) -> Callable[..., Any]:
+    """
+    Returns get_item as rendered by the previous template
+    """
+
+    def dump(model: Any) -> Any:
+        if mode == "pydantic":
+            return model.model_dump(exclude_unset=True)
+        if mode == "msgspec":
+            import msgspec
+
+            return msgspec.to_builtins(model)
+        return model
+
+    def get_item(
+        self: httpx.Client, params: Any, query: Any = None, **kwargs: Any
+    ) -> tuple[httpx.Response, Any]:
+        url = "/stores/{store_id}/items/{item_id}"
+        url = url.format(**dump(params))
+        if query:
+            url += "?" + urlencode(dump(query))
+        res = self.request("get", url, **kwargs)
+        res.raise_for_status()
+        return res, res.json()
+
+    return get_item
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    response = httpx.Response(200, content=b"{}")
+    transport = httpx.MockTransport(lambda _: response)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        spec_path = tmp_dir / "spec.json"
+        spec_path.write_text(json.dumps(SPEC))
+        sys.path.insert(0, str(tmp_dir))
+        for mode in MODES:
+            try:
+                generate(spec_path, tmp_dir / f"client_{mode}", mode)
+                module = importlib.import_module(f"client_{mode}.client")
+                params = importlib.import_module(f"client_{mode}.params")
+                queries = importlib.import_module(f"client_{mode}.queries")
+            except (ImportError, subprocess.CalledProcessError) as e:
+                print(f"{mode:>10}: skipped ({e})")
+                continue
+
+            path = {"store_id": 1, "item_id": 42}
+            query = {"fields": "id,name", "limit": 10}
+            if mode != "typeddict":
+                path = params.GetItemParams(**path)
+                query = queries.GetItemQuery(**query)
+
+            client = module.APIClient(base_url="http://bench", transport=transport)
+            legacy_cls = type("LegacyClient", (module.APIClient,), {})
+            legacy_cls.get_item = legacy_get_item(mode)
+            legacy = legacy_cls(base_url="http://bench", transport=transport)
+            assert (
+                client.get_item(path, query)[0].request.url
+                == legacy.get_item(path, query)[0].request.url
+            )
+
+            before, after = time_calls(
+                [
+                    lambda legacy=legacy, path=path, query=query: legacy.get_item(
+                        path, query
+                    ),
+                    lambda client=client, path=path, query=query: client.get_item(
+                        path, query
+                    ),
+                ],
+                args.repeat,
+                args.calls,
+            )
+            print(
+                f"{mode:>10}: previous {before * 1e6:.1f} us/call,"
+                f" current {after * 1e6:.1f} us/call"
+                f" ({(before - after) * 1e6:+.1f} us saved)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Helpers shared by the benchmarks of the generated clients.
+"""
+
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+
+def generate(spec_path: Path, output_dir: Path, mode: str = "typeddict"):
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "oas_client",
+            str(spec_path),
+            "--output-dir",
+            str(output_dir),
+            "--mode",
+            mode,
+            "--no-formatting",
+        ],
+        check=True,
+    )
+
+
+def time_calls(
+    calls: list[Callable[[], Any]], repeat: int, count: int = 1
+) -> list[float]:
+    """
+    Returns the best time per call of each call, timed over count calls
+    repeat times. The calls are interleaved so they run under the same
+    conditions.
+    """
+    best = [float("inf")] * len(calls)
+    for _ in range(repeat):
+        for i, call in enumerate(calls):
+            start = time.perf_counter()
+            for _ in range(count):
+                call()
+            best[i] = min(best[i], (time.perf_counter() - start) / count)
+    return best
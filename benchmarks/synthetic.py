@@ -0,0 +1,145 @@
+"""
+Generates synthetic OpenAPI specs for benchmarking.
+
+    python benchmarks/synthetic.py --paths 1000 --schemas 2000 > spec.json
+"""
+
+import argparse
+import json
+import random
+import sys
+from typing import Any
+
+PRIMITIVES = ["string", "integer", "number", "boolean"]
+
+
+def make_schema(
+    rng: random.Random,
+    index: int,
+    schemas: int,
+    depth: int,
+    any_of_width: int,
+    ref_fanout: int,
+) -> dict[str, Any]:
+    def ref() -> dict[str, Any]:
+        return {"$ref": f"#/components/schemas/Schema{rng.randrange(schemas)}"}
+
+    def nested(level: int) -> dict[str, Any]:
+        props: dict[str, Any] = {
+            f"field{i}": {"type": PRIMITIVES[i % len(PRIMITIVES)]} for i in range(4)
+        }
+        if level < depth:
+            props["nested"] = nested(level + 1)
+            props["nested_list"] = {"type": "array", "items": nested(level + 1)}
+        return {"type": "object", "properties": props, "required": ["field0"]}
+
+    if index % 10 == 9:
+        return {"type": "string", "enum": [f"value{i}" for i in range(5)]}
+
+    schema = nested(1) if depth > 0 else {"type": "object", "properties": {}}
+    props = schema["properties"]
+    for i in range(ref_fanout):
+        props[f"ref{i}"] = ref() if i % 2 == 0 else {"type": "array", "items": ref()}
+    if any_of_width > 0:
+        options: list[dict[str, Any]] = [{"type": "null"}]
+        for i in range(any_of_width - 1):
+            options.append(
+                ref() if i % 2 == 0 else {"type": PRIMITIVES[i % len(PRIMITIVES)]}
+            )
+        props["any_of"] = {"anyOf": options}
+    return schema
+
+
+def make_spec(
+    paths: int = 100,
+    schemas: int = 200,
+    depth: int = 2,
+    any_of_width: int = 3,
+    ref_fanout: int = 2,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Returns an OpenAPI spec with paths paths, each with a get and a post
+    operation, and schemas component schemas. Every object schema nests
+    inline objects depth levels deep, holds an anyOf property of
+    any_of_width options and references ref_fanout other schemas.
+    """
+    rng = random.Random(seed)
+    components = {
+        f"Schema{i}": make_schema(rng, i, schemas, depth, any_of_width, ref_fanout)
+        for i in range(schemas)
+    }
+    objects = [n for n, s in components.items() if s["type"] == "object"]
+
+    def body() -> dict[str, Any]:
+        return {
+            "application/json": {
+                "schema": {"$ref": f"#/components/schemas/{rng.choice(objects)}"}
+            }
+        }
+
+    spec_paths: dict[str, Any] = {}
+    for i in range(paths):
+        tags = [f"tag{i % 20}"]
+        path_param = {
+            "name": "item_id",
+            "in": "path",
+            "required": True,
+            "schema": {"type": "integer"},
+        }
+        spec_paths[f"/resource{i}/{{item_id}}"] = {
+            "get": {
+                "operationId": f"get_resource{i}",
+                "tags": tags,
+                "parameters": [
+                    path_param,
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+                    {"name": "offset", "in": "query", "schema": {"type": "integer"}},
+                    {"name": "search", "in": "query", "schema": {"type": "string"}},
+                ],
+                "responses": {"200": {"description": "OK", "content": body()}},
+            },
+            "post": {
+                "operationId": f"update_resource{i}",
+                "tags": tags,
+                "parameters": [path_param],
+                "requestBody": {"content": body()},
+                "responses": {"200": {"description": "OK", "content": body()}},
+            },
+        }
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Synthetic", "version": "1.0.0"},
+        "paths": spec_paths,
+        "components": {"schemas": components},
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--paths", type=int, default=100)
+    parser.add_argument("--schemas", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--any-of-width", type=int, default=3)
+    parser.add_argument("--ref-fanout", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def spec_from_args(args: argparse.Namespace) -> dict[str, Any]:
+    return make_spec(
+        paths=args.paths,
+        schemas=args.schemas,
+        depth=args.depth,
+        any_of_width=args.any_of_width,
+        ref_fanout=args.ref_fanout,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    json.dump(spec_from_args(parser.parse_args()), sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
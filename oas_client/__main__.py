@@ -1,21 +1,38 @@
 import argparse
-import json
+import hashlib
 import os
 import re
 import subprocess
+import time
 from pathlib import Path
+from typing import Any
 
-import httpx
-
-from oas_client.constants import BASE_IMPORTS, CONDITIONAL_IMPORTS
-from oas_client.openapi import OpenAPI
-from oas_client.renderers.client import render_client
-from oas_client.renderers.params import render_params
-from oas_client.renderers.queries import render_queries
-from oas_client.renderers.requests import render_requests
-from oas_client.renderers.responses import render_responses
+from oas_client.download import download_spec
+from oas_client.exceptions import SelectionError
+from oas_client.generator import render_modules, render_split_modules
+from oas_client.manifest import Manifest, hash_inputs
+from oas_client.profiling import Profiler, stage
+from oas_client.renderers.environment import get_renderer, is_formatted
+from oas_client.spec_cache import load_spec
+from oas_client.subset import select_operations, subset_spec
+from oas_client.types import PaginationConfig
+from oas_client.watch import WatchState, watch
 
 BASE_DIR = Path(__file__).parent
+# options that do not change the generated code
+NON_OUTPUT_OPTIONS = {
+    "openapi_json",
+    "output_dir",
+    "force",
+    "precompile_templates",
+    "jobs",
+    "profile",
+    "profile_output",
+    "no_spec_cache",
+    "no_download_cache",
+    "watch",
+    "watch_interval",
+}
 
 
 def is_url(path: str) -> bool:
@@ -26,7 +43,9 @@ def main():
     parser = argparse.ArgumentParser(
         description="Generate OpenAPI client from an OpenAPI JSON spec."
     )
-    parser.add_argument("openapi_json", help="Path or URL to the OpenAPI JSON file.")
+    parser.add_argument(
+        "openapi_json", nargs="?", help="Path or URL to the OpenAPI JSON file."
+    )
     parser.add_argument(
         "--output-dir", help="Path to the output directory.", default="client"
     )
@@ -44,55 +63,276 @@ def main():
         "--mode",
         help="Chose the base class model to use for generating schemas",
         default="typeddict",
-        choices=["typeddict", "pydantic"],
+        choices=["typeddict", "pydantic", "msgspec"],
+    )
+    pagination = parser.add_argument_group(
+        "pagination",
+        "Comma separated names used to detect paginated operations, iter_<operation>"
+        " methods are generated for them",
+    )
+    defaults = PaginationConfig()
+    for name, help_text in [
+        ("items", "Response fields holding the items of a page"),
+        ("total", "Response fields holding the total number of items"),
+        ("offset", "Query parameters of offset based pagination"),
+        ("page", "Query parameters of page number based pagination"),
+        ("cursor", "Query parameters of cursor based pagination"),
+        ("next", "Response fields holding the cursor of the next page"),
+    ]:
+        pagination.add_argument(
+            f"--pagination-{name}",
+            help=help_text,
+            type=lambda s: s.split(","),
+            default=getattr(defaults, name),
+        )
+    pagination.add_argument(
+        "--no-pagination",
+        help="Disables generation of pagination iterators",
+        action="store_true",
+    )
+    selection = parser.add_argument_group(
+        "operation selection",
+        "Comma separated tags and operation ids, only the selected operations and"
+        " the schemas they use are generated. Operation ids can be shell style"
+        " patterns",
+    )
+    for name, help_text in [
+        ("include-tags", "Generates only the operations with one of the tags"),
+        ("include-operations", "Generates only the operations with one of the ids"),
+        ("exclude-tags", "Skips the operations with one of the tags"),
+        ("exclude-operations", "Skips the operations with one of the ids"),
+    ]:
+        selection.add_argument(
+            f"--{name}", help=help_text, type=lambda s: s.split(","), default=[]
+        )
+    parser.add_argument(
+        "--split-by-tag",
+        help="Generates one client package per tag, loaded lazily on first use",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--jobs",
+        help="Number of processes used to render the modules",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--force",
+        help="Regenerates the client even if its inputs did not change",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-spec-cache",
+        help="Validates the spec again instead of loading it from the spec cache",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-download-cache",
+        help="Downloads the spec again instead of revalidating the cached copy",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--watch",
+        help="Keeps running and regenerates the client whenever the spec changes,"
+        " urls are polled with conditional requests",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        help="Seconds between two checks of the spec in --watch mode",
+        type=float,
+        default=1.0,
+    )
+    parser.add_argument(
+        "--precompile-templates",
+        help="Compiles the templates into the bytecode cache and exits",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Prints the time and peak memory of every generation stage",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile-output",
+        help="Writes a Chrome trace (.json) or a cProfile dump (any other"
+        " extension) of the generation, implies --profile",
     )
     args = parser.parse_args()
 
+    if args.precompile_templates:
+        for name in get_renderer(Path(args.template_dir)).precompile():
+            print(f"Compiled {name}")
+        return
+    if args.openapi_json is None:
+        parser.error("the following arguments are required: openapi_json")
+
+    if not args.watch:
+        try:
+            run(args)
+        except SelectionError as e:
+            parser.exit(1, f"{e}\n")
+        return
+
+    state = WatchState()
+    # the spec downloaded by the last poll, generated from as is
+    spec_bytes: bytes | None = None
+
+    def version() -> Any:
+        nonlocal spec_bytes
+        if is_url(args.openapi_json):
+            spec_bytes = download_spec(
+                args.openapi_json, use_cache=not args.no_download_cache
+            )
+            return hashlib.sha256(spec_bytes).digest()
+        st = os.stat(args.openapi_json)
+        return st.st_mtime_ns, st.st_size
+
+    def on_change():
+        start = time.perf_counter()
+        changed = run(args, state, spec_bytes)
+        if changed is not None:
+            print(
+                f"Updated {len(changed)} modules in {time.perf_counter() - start:.2f}s"
+            )
+
+    print(f"Watching {args.openapi_json}, press Ctrl+C to stop")
+    try:
+        watch(version, args.watch_interval, on_change)
+    except KeyboardInterrupt:
+        pass
+
+
+def run(
+    args: argparse.Namespace,
+    state: WatchState | None = None,
+    spec_bytes: bytes | None = None,
+) -> list[Path] | None:
+    if not (args.profile or args.profile_output):
+        return generate(args, state, spec_bytes)
+
+    profile_output = Path(args.profile_output) if args.profile_output else None
+    chrome_trace = profile_output is not None and profile_output.suffix == ".json"
+    profiler = Profiler(cprofile=profile_output is not None and not chrome_trace)
+    with profiler:
+        changed = generate(args, state, spec_bytes)
+    print(profiler.table())
+    if profile_output is not None:
+        if chrome_trace:
+            profiler.dump_chrome_trace(profile_output)
+        else:
+            profiler.dump_stats(profile_output)
+    return changed
+
+
+def read_spec(args: argparse.Namespace) -> bytes:
+    if is_url(args.openapi_json):
+        with stage("download"):
+            return download_spec(
+                args.openapi_json, use_cache=not args.no_download_cache
+            )
+    with stage("read"):
+        return Path(args.openapi_json).read_bytes()
+
+
+def generate(
+    args: argparse.Namespace,
+    state: WatchState | None = None,
+    spec_bytes: bytes | None = None,
+) -> list[Path] | None:
+    """
+    Generates the client and returns the paths of the rewritten modules,
+    None if the client is up to date. In --watch mode, state keeps what
+    later generations can reuse, and spec_bytes is the spec downloaded to
+    detect the change, which is not downloaded again.
+    """
     output_dir = Path(args.output_dir)
     template_dir = Path(args.template_dir)
 
-    if is_url(args.openapi_json):
-        res = httpx.get(args.openapi_json, timeout=30)
-        res.raise_for_status()
-        spec_json = res.json()
-    else:
-        openapi_json = Path(args.openapi_json)
-        with open(openapi_json) as f:
-            spec_json = json.load(f)
-
-    spec = OpenAPI(**spec_json)
+    if spec_bytes is None:
+        spec_bytes = read_spec(args)
+
+    with stage("hash_inputs"):
+        options = {k: v for k, v in vars(args).items() if k not in NON_OUTPUT_OPTIONS}
+        inputs = hash_inputs(spec_bytes, template_dir, options)
+        manifest = Manifest.load(output_dir)
+    if not args.force and manifest.is_up_to_date(output_dir, inputs):
+        print("Client is up to date. Skipping...")
+        return None
+
+    with stage("load_spec"):
+        if state is not None:
+            spec = state.load_spec(spec_bytes, use_cache=not args.no_spec_cache)
+        else:
+            spec = load_spec(spec_bytes, use_cache=not args.no_spec_cache)
+    if (
+        args.include_tags
+        or args.include_operations
+        or args.exclude_tags
+        or args.exclude_operations
+    ):
+        with stage("select_operations"):
+            operations = select_operations(
+                spec,
+                include_tags=args.include_tags,
+                include_operations=args.include_operations,
+                exclude_tags=args.exclude_tags,
+                exclude_operations=args.exclude_operations,
+            )
+            spec = subset_spec(spec, operations)
     os.makedirs(output_dir, exist_ok=True)
 
-    model_to_use = "typing"
-    class_to_use = "TypedDict"
-    if args.mode == "pydantic":
-        model_to_use = "pydantic"
-        class_to_use = "BaseModel"
-    imports: set[tuple[str, str]] = BASE_IMPORTS.union(
-        CONDITIONAL_IMPORTS.get(model_to_use, set())
-    )
-    responses = render_responses(spec, template_dir, imports, class_to_use)
-    requests = render_requests(spec, template_dir, imports, class_to_use)
-    queries = render_queries(spec, template_dir, imports, class_to_use)
-    params = render_params(spec, template_dir, imports, class_to_use)
-    client = render_client(spec, template_dir, model_to_use)
-
-    (output_dir / "__init__.py").write_text("")
-    (output_dir / "responses.py").write_text(responses)
-    (output_dir / "requests.py").write_text(requests)
-    (output_dir / "queries.py").write_text(queries)
-    (output_dir / "params.py").write_text(params)
-    (output_dir / "client.py").write_text(client)
-
-    if not args.no_formatting:
+    pagination_config = None
+    if not args.no_pagination:
+        pagination_config = PaginationConfig(
+            items=args.pagination_items,
+            total=args.pagination_total,
+            offset=args.pagination_offset,
+            page=args.pagination_page,
+            cursor=args.pagination_cursor,
+            next=args.pagination_next,
+        )
+    with stage("render"):
+        if args.split_by_tag:
+            modules = render_split_modules(
+                spec,
+                template_dir,
+                args.mode,
+                pagination_config,
+                jobs=args.jobs,
+                cache=state.packages if state is not None else None,
+            )
+        else:
+            modules = render_modules(
+                spec, template_dir, args.mode, pagination_config, jobs=args.jobs
+            )
+
+    # only modules whose rendered code changed are rewritten and formatted
+    with stage("write"):
+        changed = manifest.write_changed(
+            output_dir,
+            modules,
+            formatted=not args.no_formatting,
+        )
+
+    # the rendered code is lint clean and mostly formatted already, ruff
+    # only runs on the modules with lines it has to split
+    unformatted = [
+        path
+        for path in changed
+        if not is_formatted(modules[path.relative_to(output_dir).as_posix()])
+    ]
+    if not args.no_formatting and unformatted:
         try:
-            # linting
-            subprocess.run(["ruff", "check", "--fix", "--quiet", output_dir])
-            # formatting
-            subprocess.run(["ruff", "format", "--quiet", output_dir])
+            with stage("ruff_format"):
+                subprocess.run(["ruff", "format", "--quiet", *unformatted])
         except FileNotFoundError:
             print("ruff not found in path. Skipping...")
 
+    manifest.inputs = inputs
+    manifest.save(output_dir)
+    return changed
+
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,16 @@
 from typing import Literal
 
+# order in which operations of a path item are visited
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
 BASE_IMPORTS = {
     ("typing", "Any"),
     ("typing", "Literal"),
 }
-CONDITIONAL_IMPORTS: dict[Literal["pydantic", "typing"], set[tuple[str, str]]] = {
+CONDITIONAL_IMPORTS: dict[
+    Literal["pydantic", "typing", "msgspec"], set[tuple[str, str]]
+] = {
     "pydantic": {("pydantic", "BaseModel")},
+    "msgspec": {("msgspec", "Struct"), ("msgspec", "UNSET"), ("msgspec", "UnsetType")},
     "typing": {("typing_extensions", "TypedDict"), ("typing", "NotRequired")},
 }
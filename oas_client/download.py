@@ -0,0 +1,95 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import httpx
+from pydantic import BaseModel, ValidationError
+
+from oas_client.utils import get_cache_dir
+
+
+class CachedResponse(BaseModel):
+    """
+    Validators of a downloaded spec, sent back as conditional headers on
+    the next download
+    """
+
+    url: str
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class DownloadCache:
+    """
+    Keeps the last downloaded body of every url with its validators, so
+    an unchanged spec costs a single 304 round trip
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+
+    def paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def get(self, url: str) -> CachedResponse | None:
+        meta_path, body_path = self.paths(url)
+        try:
+            meta = CachedResponse.model_validate_json(meta_path.read_bytes())
+        except (OSError, ValidationError):
+            return None
+        if meta.url != url or not body_path.exists():
+            return None
+        return meta
+
+    def fetch(self, url: str, timeout: float = 30) -> bytes:
+        """
+        Downloads the url, revalidating the cached body if there is one.
+        The body is decompressed and streamed to the cache directory
+        instead of being buffered in memory.
+        """
+        meta_path, body_path = self.paths(url)
+        cached = self.get(url)
+        headers: dict[str, str] = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        # httpx advertises every encoding it can decode: gzip and deflate,
+        # br and zstd when brotli and zstandard are installed
+        with httpx.stream("GET", url, headers=headers, timeout=timeout) as res:
+            if res.status_code == 304 and cached is not None:
+                return body_path.read_bytes()
+            res.raise_for_status()
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in res.iter_bytes():
+                        f.write(chunk)
+                os.replace(tmp, body_path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            meta = CachedResponse(
+                url=url,
+                etag=res.headers.get("ETag"),
+                last_modified=res.headers.get("Last-Modified"),
+            )
+        if meta.etag or meta.last_modified:
+            meta_path.write_text(meta.model_dump_json())
+        else:
+            # nothing to revalidate with, the next run downloads again
+            meta_path.unlink(missing_ok=True)
+        return body_path.read_bytes()
+
+
+def download_spec(url: str, use_cache: bool = True) -> bytes:
+    cache_dir = get_cache_dir("downloads") if use_cache else None
+    if cache_dir is None:
+        res = httpx.get(url, timeout=30)
+        res.raise_for_status()
+        return res.content
+    return DownloadCache(cache_dir).fetch(url)
@@ -4,3 +4,7 @@ class OASException(Exception):
 
 class ReferenceNotResolved(OASException):
     pass
+
+
+class SelectionError(OASException):
+    pass
@@ -0,0 +1,285 @@
+import math
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+from oas_client.constants import BASE_IMPORTS, CONDITIONAL_IMPORTS
+from oas_client.index import IndexedOperation, get_operation_index
+from oas_client.openapi import OpenAPI
+from oas_client.parser import find_functions, traverse_path_methods_get
+from oas_client.profiling import stage
+from oas_client.renderers.client import (
+    render_cache,
+    render_client,
+    render_facade,
+    render_hooks,
+    render_lazy,
+    render_stream,
+)
+from oas_client.renderers.params import render_params
+from oas_client.renderers.queries import render_queries
+from oas_client.renderers.requests import find_request_schemas, render_requests
+from oas_client.renderers.responses import find_response_schemas, render_responses
+from oas_client.subset import subset_spec
+from oas_client.types import PaginationConfig, ParserOutput
+from oas_client.utils import to_identifier
+
+# smallest number of schemas converted by a single worker
+MIN_SHARD_SIZE = 256
+
+# specs rendered by the worker, keyed by tag for the tag packages of
+# --split-by-tag
+_worker_specs: dict[str | None, OpenAPI] = {}
+
+
+class TagPackage(BaseModel):
+    """
+    Modules and client methods rendered for a tag, with the parts of the
+    spec subset they were rendered from
+    """
+
+    parts: dict[str, Any]
+    modules: dict[str, str]
+    methods: list[str]
+
+
+def _init_worker(specs: dict[str | None, OpenAPI]):
+    global _worker_specs
+    _worker_specs = specs
+
+
+def _run_in_worker(tag: str | None, func: Callable[..., Any], *args: Any) -> Any:
+    return func(_worker_specs[tag], *args)
+
+
+class _SerialExecutor(Executor):
+    def __init__(self, spec: OpenAPI):
+        self.spec = spec
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        future: Future = Future()
+        with stage(getattr(fn, "__name__", repr(fn))):
+            future.set_result(fn(self.spec, *args, **kwargs))
+        return future
+
+
+def get_model(
+    mode: Literal["typeddict", "pydantic", "msgspec"],
+) -> tuple[str, str, set[tuple[str, str]]]:
+    """
+    Returns the model, the schema base class and the schema imports of
+    the mode
+    """
+    model_to_use = "typing"
+    class_to_use = "TypedDict"
+    if mode == "pydantic":
+        model_to_use = "pydantic"
+        class_to_use = "BaseModel"
+    elif mode == "msgspec":
+        model_to_use = "msgspec"
+        class_to_use = "Struct"
+    imports: set[tuple[str, str]] = BASE_IMPORTS.union(
+        CONDITIONAL_IMPORTS.get(model_to_use, set())
+    )
+    return model_to_use, class_to_use, imports
+
+
+def shard(names: list[str], jobs: int) -> list[list[str]]:
+    size = max(math.ceil(len(names) / jobs), MIN_SHARD_SIZE)
+    return [names[i : i + size] for i in range(0, len(names), size)] or [[]]
+
+
+def render_modules(
+    spec: OpenAPI,
+    template_dir: Path,
+    mode: Literal["typeddict", "pydantic", "msgspec"] = "typeddict",
+    pagination: PaginationConfig | None = None,
+    jobs: int = 1,
+    pool: Executor | None = None,
+    tag: str | None = None,
+) -> dict[str, str]:
+    """
+    Renders every module of the client. With jobs > 1 the modules are
+    rendered in a process pool and the schemas of the requests and
+    responses modules are converted in shards. The output is identical
+    to the serial one.
+
+    With a tag, spec is the subset of a tag package, whose client imports
+    the cache, hooks, lazy and stream modules of the parent package, so
+    they are not rendered. A pool whose workers hold spec under the key
+    tag can be passed, to share it between the tag packages.
+    """
+    if pool is None and jobs > 1:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=({None: spec},)
+        ) as executor:
+            return render_modules(spec, template_dir, mode, pagination, jobs, executor)
+
+    model_to_use, class_to_use, imports = get_model(mode)
+
+    # reachable schemas in declaration order, so concatenated shards keep
+    # the serial order
+    declared = list(spec.components.schemas) if spec.components else []
+    with stage("traverse_path_methods_get"):
+        request_names = set(traverse_path_methods_get(spec, "requests"))
+        response_names = set(traverse_path_methods_get(spec, "response"))
+
+    serial = _SerialExecutor(spec)
+
+    def submit(func: Callable[..., Any], *args: Any) -> Future:
+        if pool is not None:
+            return pool.submit(_run_in_worker, tag, func, *args)
+        return serial.submit(func, *args)
+
+    request_shards = [
+        submit(find_request_schemas, class_to_use, names)
+        for names in shard([n for n in declared if n in request_names], jobs)
+    ]
+    response_shards = [
+        submit(find_response_schemas, class_to_use, names)
+        for names in shard([n for n in declared if n in response_names], jobs)
+    ]
+    queries = submit(render_queries, template_dir, imports, class_to_use)
+    params = submit(render_params, template_dir, imports, class_to_use)
+    runtime = "." if tag is None else ".."
+    client = submit(render_client, template_dir, model_to_use, pagination, runtime)
+
+    request_schemas: list[ParserOutput] = []
+    for f in request_shards:
+        request_schemas.extend(f.result())
+    response_schemas: list[ParserOutput] = []
+    for f in response_shards:
+        response_schemas.extend(f.result())
+    requests = submit(
+        render_requests, template_dir, imports, class_to_use, request_schemas
+    )
+    responses = submit(
+        render_responses, template_dir, imports, class_to_use, response_schemas
+    )
+
+    modules = {
+        "__init__.py": "",
+        "responses.py": responses.result(),
+        "requests.py": requests.result(),
+        "queries.py": queries.result(),
+        "params.py": params.result(),
+        "client.py": client.result(),
+    }
+    if tag is None:
+        modules.update(render_runtime(template_dir))
+    return modules
+
+
+def render_runtime(template_dir: Path) -> dict[str, str]:
+    """
+    Renders the modules the clients import at runtime, which do not
+    depend on the spec
+    """
+    return {
+        "cache.py": render_cache(template_dir),
+        "hooks.py": render_hooks(template_dir),
+        "lazy.py": render_lazy(template_dir),
+        "stream.py": render_stream(template_dir),
+    }
+
+
+def spec_parts(spec: OpenAPI) -> dict[str, Any]:
+    return {name: getattr(spec, name) for name in OpenAPI.model_fields}
+
+
+# modules of the root package, tag packages can not take their name
+ROOT_MODULES = {"client", "cache", "hooks", "lazy", "stream"}
+
+
+def group_by_tag(spec: OpenAPI) -> dict[str, list[IndexedOperation]]:
+    """
+    Returns the operations of every tag package, operations are grouped
+    by their first tag. Tags named like a root module get a trailing
+    underscore, which tag identifiers never end with otherwise.
+    """
+    groups: dict[str, list[IndexedOperation]] = {}
+    for op in get_operation_index(spec):
+        tag = to_identifier(op.operation.tags[0]) if op.operation.tags else "default"
+        if tag in ROOT_MODULES:
+            tag = f"{tag}_"
+        groups.setdefault(tag, []).append(op)
+    return groups
+
+
+def render_split_modules(
+    spec: OpenAPI,
+    template_dir: Path,
+    mode: Literal["typeddict", "pydantic", "msgspec"] = "typeddict",
+    pagination: PaginationConfig | None = None,
+    jobs: int = 1,
+    cache: dict[str, TagPackage] | None = None,
+) -> dict[str, str]:
+    """
+    Renders one client package per tag, with only the operations of the
+    tag and the schemas they use, and a client facade loading the tag
+    packages lazily. Operations are grouped by their first tag.
+
+    Tag packages found in cache, with the same spec subset, are reused
+    instead of rendered again. The cache is updated with the rendered
+    packages. With jobs > 1, the other ones are rendered in a single
+    process pool.
+    """
+    groups = group_by_tag(spec)
+    packages: dict[str, TagPackage] = {}
+    # spec subsets of the packages to render
+    tag_specs: dict[str | None, OpenAPI] = {}
+    for tag, operations in groups.items():
+        with stage(f"subset {tag}"):
+            tag_spec = subset_spec(spec, operations)
+            # the parts of unchanged specs mostly are the same objects, so
+            # comparing them is cheap
+            parts = spec_parts(tag_spec)
+            package = cache.get(tag) if cache is not None else None
+            if package is None or package.parts != parts:
+                package = TagPackage(parts=parts, modules={}, methods=[])
+                tag_specs[tag] = tag_spec
+            packages[tag] = package
+
+    with ExitStack() as stack:
+        pool: Executor | None = None
+        if jobs > 1 and tag_specs:
+            # the subsets are sent to the workers together, so the
+            # schemas they share are pickled once
+            pool = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=jobs, initializer=_init_worker, initargs=(tag_specs,)
+                )
+            )
+        for tag, package in packages.items():
+            tag_spec = tag_specs.get(tag)
+            if tag_spec is None:
+                continue
+            with stage(f"tag {tag}"):
+                package.modules = render_modules(
+                    tag_spec, template_dir, mode, pagination, jobs, pool, tag
+                )
+                for func in find_functions(tag_spec, pagination):
+                    package.methods.append(func.func_name)
+                    if func.pagination:
+                        package.methods.append(f"iter_{func.func_name}")
+                    if func.stream_item:
+                        package.methods.append(f"stream_{func.func_name}")
+
+    # the tag packages share the runtime modules of the root package
+    modules: dict[str, str] = {"__init__.py": "", **render_runtime(template_dir)}
+    methods: dict[str, str] = {}
+    for tag, package in packages.items():
+        for name, code in package.modules.items():
+            modules[f"{tag}/{name}"] = code
+        for method in package.methods:
+            methods[method] = tag
+    if cache is not None:
+        cache.clear()
+        cache.update(packages)
+    with stage("render_facade"):
+        modules["client.py"] = render_facade(template_dir, methods, list(groups))
+    return modules
@@ -0,0 +1,97 @@
+from collections.abc import Iterable
+
+from oas_client.openapi import OpenAPI, Reference, Schema
+
+
+def collect_schema_refs(schema: Schema, refs: set[str]):
+    if schema.properties:
+        for prop_schema in schema.properties.values():
+            if isinstance(prop_schema, Reference):
+                refs.add(prop_schema.ref)
+            else:
+                collect_schema_refs(prop_schema, refs)
+
+    if schema.items:
+        if isinstance(schema.items, Reference):
+            refs.add(schema.items.ref)
+        else:
+            collect_schema_refs(schema.items, refs)
+
+    if isinstance(schema.additional_properties, Reference):
+        refs.add(schema.additional_properties.ref)
+    elif isinstance(schema.additional_properties, Schema):
+        collect_schema_refs(schema.additional_properties, refs)
+
+    for composition_list in [schema.all_of, schema.one_of, schema.any_of]:
+        if composition_list:
+            for item in composition_list:
+                if isinstance(item, Reference):
+                    refs.add(item.ref)
+                else:
+                    collect_schema_refs(item, refs)
+
+    if schema.not_:
+        if isinstance(schema.not_, Reference):
+            refs.add(schema.not_.ref)
+        else:
+            collect_schema_refs(schema.not_, refs)
+
+
+def ref_name(ref: str) -> str:
+    # pattern = #/components/schemas/PagedServerSchema
+    return ref.split("/")[-1]
+
+
+class SchemaGraph:
+    """
+    Dependency graph between the component schemas. Direct references of
+    every schema are collected once, reachability queries walk the graph
+    with a visited set so cycles terminate and each schema is expanded at
+    most once per query. Query results are memoized.
+    """
+
+    def __init__(self, spec: OpenAPI):
+        self.edges: dict[str, list[str]] = {}
+        self._reachable: dict[frozenset[str], frozenset[str]] = {}
+        if spec.components is None:
+            return
+        for name, schema in spec.components.schemas.items():
+            refs: set[str] = set()
+            if isinstance(schema, Reference):
+                refs.add(schema.ref)
+            else:
+                collect_schema_refs(schema, refs)
+            self.edges[name] = sorted(ref_name(r) for r in refs)
+
+    def reachable(self, roots: Iterable[str]) -> frozenset[str]:
+        """
+        Returns the roots and every schema transitively referenced by them
+        """
+        key = frozenset(roots)
+        cached = self._reachable.get(key)
+        if cached is not None:
+            return cached
+        visited: set[str] = set()
+        stack = list(key)
+        while stack:
+            name = stack.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            stack.extend(n for n in self.edges.get(name, []) if n not in visited)
+        result = self._reachable[key] = frozenset(visited)
+        return result
+
+    def dependencies(self, name: str) -> frozenset[str]:
+        """
+        Returns every schema transitively referenced by the schema, the
+        schema itself is included only when it is part of a cycle
+        """
+        return self.reachable(self.edges.get(name, []))
+
+
+def get_schema_graph(spec: OpenAPI) -> SchemaGraph:
+    graph = spec._cache.get("schema_graph")
+    if graph is None:
+        graph = spec._cache["schema_graph"] = SchemaGraph(spec)
+    return graph
@@ -0,0 +1,129 @@
+from collections.abc import Iterator
+
+from pydantic import BaseModel
+
+from oas_client.constants import HTTP_METHODS
+from oas_client.exceptions import ReferenceNotResolved
+from oas_client.openapi import (
+    MediaType,
+    OpenAPI,
+    Operation,
+    Parameter,
+    ParameterIn,
+    PathItem,
+    Reference,
+    RequestBody,
+    Response,
+)
+from oas_client.utils import (
+    get_parameter_by_reference,
+    get_request_body_by_reference,
+    get_response_by_reference,
+)
+
+
+class IndexedOperation(BaseModel):
+    method: str
+    path: str
+    operation_id: str | None
+    operation: Operation
+    # path item and operation parameters, split by location
+    parameters: dict[ParameterIn, list[Parameter]]
+    request_body: RequestBody | None
+    # every response of the operation with references resolved
+    responses: dict[str, Response]
+    # application/json content of the 2xx responses
+    json_responses: dict[str, MediaType]
+
+
+def is_ok_status(code: str) -> bool:
+    if code.upper() == "2XX":
+        return True
+    return code.isdigit() and 200 <= int(code) <= 299
+
+
+class OperationIndex:
+    """
+    Flat list of every operation in the spec, built in a single walk
+    over spec.paths and shared by all parser passes
+    """
+
+    def __init__(self, spec: OpenAPI):
+        self.operations: list[IndexedOperation] = []
+        for path, path_item in spec.paths.items():
+            for method in HTTP_METHODS:
+                operation: Operation | None = getattr(path_item, method)
+                if operation is None:
+                    continue
+                self.operations.append(
+                    self._index_operation(spec, path, path_item, method, operation)
+                )
+
+    def __iter__(self) -> Iterator[IndexedOperation]:
+        return iter(self.operations)
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def with_operation_id(self) -> list[IndexedOperation]:
+        return [o for o in self.operations if o.operation_id]
+
+    @staticmethod
+    def _index_operation(
+        spec: OpenAPI,
+        path: str,
+        path_item: PathItem,
+        method: str,
+        operation: Operation,
+    ) -> IndexedOperation:
+        # operation level parameters override the path level ones
+        merged: dict[tuple[str, ParameterIn], Parameter] = {}
+        for p in [*path_item.parameters, *operation.parameters]:
+            if isinstance(p, Reference):
+                if spec.components is None:
+                    continue
+                try:
+                    p = get_parameter_by_reference(spec.components, p)
+                except ReferenceNotResolved:
+                    continue
+            merged[(p.name, p.in_)] = p
+        parameters: dict[ParameterIn, list[Parameter]] = {i: [] for i in ParameterIn}
+        for p in merged.values():
+            parameters[p.in_].append(p)
+
+        request_body = operation.request_body
+        if isinstance(request_body, Reference):
+            request_body = (
+                get_request_body_by_reference(spec.components, request_body)
+                if spec.components
+                else None
+            )
+
+        responses: dict[str, Response] = {}
+        json_responses: dict[str, MediaType] = {}
+        for code, res in operation.responses.items():
+            if isinstance(res, Reference):
+                if spec.components is None:
+                    continue
+                res = get_response_by_reference(spec.components, res)
+            responses[code] = res
+            if is_ok_status(code) and "application/json" in res.content:
+                json_responses[code] = res.content["application/json"]
+
+        return IndexedOperation(
+            method=method,
+            path=path,
+            operation_id=operation.operation_id,
+            operation=operation,
+            parameters=parameters,
+            request_body=request_body,
+            responses=responses,
+            json_responses=json_responses,
+        )
+
+
+def get_operation_index(spec: OpenAPI) -> OperationIndex:
+    index = spec._cache.get("operation_index")
+    if index is None:
+        index = spec._cache["operation_index"] = OperationIndex(spec)
+    return index
@@ -0,0 +1,112 @@
+from collections.abc import Collection
+from typing import Any, NamedTuple
+
+from oas_client.openapi import OpenAPI, Schema
+from oas_client.types import ParserOutput, make_optional, resolve_type
+
+
+# tuples rather than models, there is one per property of every schema
+class ResolvedField(NamedTuple):
+    name: str
+    type: str
+    required: bool
+
+
+class ResolvedSchema(NamedTuple):
+    # properties of object schemas
+    fields: tuple[ResolvedField, ...] = ()
+    # values of string schemas
+    enum: list[Any] | None = None
+
+
+class SchemaIR:
+    """
+    Intermediate representation of the component schemas shared by the
+    request and response passes. The property types of every schema are
+    resolved once, on first use, keyed by the schema name the references
+    point to. The request (partial) and response variants are derived
+    from it by schema_output, once per schema class type.
+    """
+
+    def __init__(self):
+        self._schemas: dict[str, ResolvedSchema] = {}
+        self._outputs: dict[tuple[str, str, bool], ParserOutput] = {}
+
+    def resolve(self, name: str, schema: Schema) -> ResolvedSchema:
+        resolved = self._schemas.get(name)
+        if resolved is not None:
+            return resolved
+        if schema.type == "object":
+            required = set(schema.required)
+            resolved = ResolvedSchema(
+                fields=tuple(
+                    ResolvedField(prop_name, resolve_type(prop), prop_name in required)
+                    for prop_name, prop in schema.properties.items()
+                )
+            )
+        elif schema.type == "string":
+            resolved = ResolvedSchema(enum=schema.enum)
+        else:
+            raise NotImplementedError(
+                f"Schema type {schema.type} is not implemented. Create an"
+                " issue in GitHub."
+            )
+        self._schemas[name] = resolved
+        return resolved
+
+    def output(
+        self, name: str, schema: Schema, schema_cls_type: str, partial: bool
+    ) -> ParserOutput:
+        """
+        Returns the schema to render, shared by every caller so it must not
+        be modified
+        """
+        key = (name, schema_cls_type, partial)
+        output = self._outputs.get(key)
+        if output is None:
+            resolved = self.resolve(name, schema)
+            output = self._outputs[key] = schema_output(
+                name, resolved, schema_cls_type, partial
+            )
+        return output
+
+    def reuse(self, previous: "SchemaIR", names: Collection[str]):
+        """
+        Takes the resolved schemas of names from previous, for schemas that
+        did not change since previous was built
+        """
+        for name in names:
+            resolved = previous._schemas.get(name)
+            if resolved is not None:
+                self._schemas[name] = resolved
+        for key, output in previous._outputs.items():
+            if key[0] in names:
+                self._outputs[key] = output
+
+
+def schema_output(
+    name: str, resolved: ResolvedSchema, schema_cls_type: str, partial: bool
+) -> ParserOutput:
+    """
+    Returns the schema to render, partial schemas make the properties that
+    are not required optional. Response models and structs give them a
+    default too, a body without them is rejected otherwise.
+    """
+    if resolved.enum is not None:
+        return ParserOutput(name=name, fields=resolved.enum, type="Literal")
+    fields: list[dict[str, str]] = []
+    for f in resolved.fields:
+        field = {"name": f.name}
+        type_str = f.type
+        if not f.required and (partial or schema_cls_type != "TypedDict"):
+            type_str = make_optional(field, type_str, schema_cls_type)
+        field["type"] = type_str
+        fields.append(field)
+    return ParserOutput(name=name, fields=fields, type=schema_cls_type)
+
+
+def get_schema_ir(spec: OpenAPI) -> SchemaIR:
+    ir = spec._cache.get("schema_ir")
+    if ir is None:
+        ir = spec._cache["schema_ir"] = SchemaIR()
+    return ir
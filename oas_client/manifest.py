@@ -0,0 +1,84 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from oas_client import __version__
+
+MANIFEST_NAME = ".oas-client.json"
+
+
+def hash_inputs(spec: bytes, template_dir: Path, options: dict[str, Any]) -> str:
+    """
+    Returns a hash of everything the generated client depends on
+    """
+    h = hashlib.sha256()
+    h.update(__version__.encode())
+    h.update(hashlib.sha256(spec).digest())
+    for template in sorted(template_dir.glob("*.jinja2")):
+        h.update(template.name.encode())
+        h.update(hashlib.sha256(template.read_bytes()).digest())
+    h.update(json.dumps(options, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def hash_module(code: str) -> str:
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+class Manifest(BaseModel):
+    """
+    Records the inputs of the last generation and the hash of every module
+    rendered from them, stored in the output directory
+    """
+
+    version: str = __version__
+    inputs: str = ""
+    formatted: bool = False
+    modules: dict[str, str] = {}
+
+    @classmethod
+    def load(cls, output_dir: Path) -> "Manifest":
+        try:
+            return cls.model_validate_json((output_dir / MANIFEST_NAME).read_bytes())
+        except (OSError, ValidationError):
+            return cls()
+
+    def save(self, output_dir: Path):
+        (output_dir / MANIFEST_NAME).write_text(self.model_dump_json(indent=2) + "\n")
+
+    def is_up_to_date(self, output_dir: Path, inputs: str) -> bool:
+        return (
+            self.version == __version__
+            and self.inputs == inputs
+            and all((output_dir / name).exists() for name in self.modules)
+        )
+
+    def write_changed(
+        self, output_dir: Path, modules: dict[str, str], formatted: bool
+    ) -> list[Path]:
+        """
+        Writes the modules whose rendered code changed since the last
+        generation and returns their paths
+        """
+        rewrite_all = self.formatted != formatted
+        written: list[Path] = []
+        for name, code in modules.items():
+            path = output_dir / name
+            digest = hash_module(code)
+            if rewrite_all or self.modules.get(name) != digest or not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(code)
+                written.append(path)
+            self.modules[name] = digest
+        # remove modules that are no longer generated
+        for name in set(self.modules) - set(modules):
+            path = output_dir / name
+            path.unlink(missing_ok=True)
+            if path.parent != output_dir and not any(path.parent.iterdir()):
+                path.parent.rmdir()
+            del self.modules[name]
+        self.formatted = formatted
+        return written
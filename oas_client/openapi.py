@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field, HttpUrl, RootModel
+from pydantic import BaseModel, Field, HttpUrl, PrivateAttr, RootModel
 
 
 class SecuritySchemeType(str, Enum):
@@ -304,6 +304,10 @@ class OpenAPI(BaseModel):
     tags: list[Tag] = []
     external_docs: ExternalDocumentation | None = Field(None, alias="externalDocs")
 
+    # derived structures (operation index, schema graph, ...) built
+    # lazily from this spec and shared by every parser pass
+    _cache: dict[str, Any] = PrivateAttr(default_factory=dict)
+
     class Config:
         validate_by_name = True
 
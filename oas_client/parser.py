@@ -1,288 +1,278 @@
+from collections.abc import Collection, Iterable
 from typing import Literal
 from warnings import warn
 
-from oas_client.openapi import (
-    OpenAPI,
-    Operation,
-    Parameter,
-    Reference,
-    RequestBody,
-    Schema,
-)
-from oas_client.types import FunctionSignature, ParserOutput, resolve_type
-from oas_client.utils import (
-    get_response_by_reference,
-    get_schema_by_reference,
-    to_pascal_case,
+from oas_client.graph import collect_schema_refs, get_schema_graph, ref_name
+from oas_client.index import IndexedOperation, get_operation_index
+from oas_client.ir import get_schema_ir
+from oas_client.openapi import MediaType, OpenAPI, ParameterIn, Reference, Schema
+from oas_client.types import (
+    FunctionSignature,
+    Pagination,
+    PaginationConfig,
+    ParserOutput,
+    decodable_type,
+    make_optional,
+    resolve_type,
 )
+from oas_client.utils import get_schema_by_reference, to_pascal_case
 
 
 def find_schemas(
-    spec: OpenAPI, schema_cls_type: str, partial: bool = False
+    spec: OpenAPI,
+    schema_cls_type: str,
+    partial: bool = False,
+    names: Collection[str] | None = None,
 ) -> list[ParserOutput]:
+    """
+    Converts the component schemas, only the ones in names if given, in
+    the order they are declared in the spec
+    """
     if not spec.components:
         return []
-    schemas = spec.components.schemas
+    ir = get_schema_ir(spec)
+    structs = find_structs(spec) if schema_cls_type == "Struct" else set()
     output: list[ParserOutput] = []
-    for name, schema in schemas.items():
+    for name, schema in spec.components.schemas.items():
+        if names is not None and name not in names:
+            continue
         if isinstance(schema, Reference):
             schema = get_schema_by_reference(spec.components, schema)
-        schema_type = schema.type
-        if schema_type == "object":
-            fields: list[dict[str, str]] = []
-            required: set[str] = set(schema.required)
-            props = schema.properties
-            for prop_name, prop in props.items():
-                type_str = resolve_type(prop)
-                field = {"name": prop_name}
-                if partial and prop_name not in required:
-                    if schema_cls_type == "BaseModel":
-                        field["value"] = "None"
-                        if not type_str.endswith("| None"):
-                            type_str = f"{type_str} | None"
-                    else:
-                        type_str = f"NotRequired[{type_str}]"
-
-                field["type"] = type_str
-                fields.append(field)
-
-            output.append(ParserOutput(name=name, fields=fields, type=schema_cls_type))
-        elif schema_type == "string":
-            output.append(ParserOutput(name=name, fields=schema.enum, type="Literal"))
-        else:
-            raise NotImplementedError(
-                f"Schema type {schema_type} is not implemented. Create an"
-                " issue in GitHub."
-            )
+        schema_output = ir.output(name, schema, schema_cls_type, partial)
+        if structs and schema_output.type == "Struct":
+            schema_output = decodable_output(schema_output, structs)
+        output.append(schema_output)
     return output
 
 
+def find_structs(spec: OpenAPI) -> set[str]:
+    """
+    Returns the names of the component schemas rendered as a struct
+    """
+    if not spec.components:
+        return set()
+    structs: set[str] = set()
+    for name, schema in spec.components.schemas.items():
+        if isinstance(schema, Reference):
+            schema = get_schema_by_reference(spec.components, schema)
+        if schema.type == "object":
+            structs.add(name)
+    return structs
+
+
+def decodable_output(output: ParserOutput, structs: Collection[str]) -> ParserOutput:
+    """
+    Returns the struct with the field types msgspec can not decode merged,
+    the cached output is shared and left as is
+    """
+    fields = [
+        {**field, "type": decodable_type(field["type"], structs)}
+        for field in output.fields
+        if isinstance(field, dict)
+    ]
+    if fields == output.fields:
+        return output
+    return output.model_copy(update={"fields": fields})
+
+
 def find_parameters(
     spec: OpenAPI, in_filter: Literal["query", "path"], parameter_cls_type: str
 ) -> list[ParserOutput]:
     output: list[ParserOutput] = []
 
-    for _, path_item in spec.paths.items():
-        operations = [
-            path_item.get,
-            path_item.put,
-            path_item.post,
-            path_item.delete,
-            path_item.options,
-            path_item.head,
-            path_item.patch,
-            path_item.trace,
-        ]
-
-        for operation in operations:
-            if operation is None:
-                continue
-            operation_id = operation.operation_id
-            if not operation_id:
-                continue
-
-            params = [
-                o
-                for o in operation.parameters
-                if isinstance(o, Parameter) and o.in_.value == in_filter
-            ]
-            if not params:
-                continue
-            fields: list[dict[str, str]] = []
-            for q in params:
-                name = q.name
-                required = q.required
-                schema = q.schema_
-                type_str = resolve_type(schema)
-                field = {"name": name}
-                if not required:
-                    if parameter_cls_type == "BaseModel":
-                        field["value"] = "None"
-                        if not type_str.endswith("| None"):
-                            type_str = f"{type_str} | None"
-                    else:
-                        type_str = f"NotRequired[{type_str}]"
-                field["type"] = type_str
-                fields.append(field)
-
-            output.append(
-                ParserOutput(
-                    name=operation_id,
-                    fields=fields,
-                    type=parameter_cls_type,
-                )
+    for operation in get_operation_index(spec).with_operation_id():
+        params = operation.parameters[ParameterIn(in_filter)]
+        if not params:
+            continue
+        fields: list[dict[str, str]] = []
+        for q in params:
+            name = q.name
+            required = q.required
+            schema = q.schema_
+            type_str = resolve_type(schema)
+            field = {"name": name}
+            if not required:
+                type_str = make_optional(field, type_str, parameter_cls_type)
+            field["type"] = type_str
+            fields.append(field)
+
+        output.append(
+            ParserOutput(
+                name=str(operation.operation_id),
+                fields=fields,
+                type=parameter_cls_type,
             )
+        )
 
     return output
 
 
-def find_functions(spec: OpenAPI):
+def find_pagination(
+    spec: OpenAPI, op: IndexedOperation, config: PaginationConfig
+) -> Pagination | None:
+    """
+    Detects paginated operations from their query parameters and the
+    fields of their response schema
+    """
+    query = {p.name for p in op.parameters[ParameterIn.QUERY]}
+    if not query or not op.json_responses or spec.components is None:
+        return None
+    schema = next(iter(op.json_responses.values())).schema_
+    if schema is None:
+        return None
+    if isinstance(schema, Reference):
+        schema = get_schema_by_reference(spec.components, schema)
+    props = schema.properties
+
+    def first(names: list[str], available: Iterable[str]) -> str | None:
+        return next((n for n in names if n in available), None)
+
+    arrays = {
+        n: p for n, p in props.items() if isinstance(p, Schema) and p.type == "array"
+    }
+    items = first(config.items, arrays)
+    if items is None:
+        return None
+    items_schema = arrays[items]
+    item_type = "Any"
+    if isinstance(items_schema.items, Reference):
+        item_type = "responses." + ref_name(items_schema.items.ref)
+    elif items_schema.items is not None:
+        item_type = resolve_type(items_schema.items)
+        if '"' in item_type:
+            item_type = "Any"
+
+    next_ = first(config.next, props)
+    total = first(config.total, props)
+    if (cursor := first(config.cursor, query)) and next_:
+        style, param = "cursor", cursor
+    elif offset := first(config.offset, query):
+        style, param = "offset", offset
+    elif page := first(config.page, query):
+        style, param = "page", page
+    else:
+        return None
+    return Pagination(
+        style=style,
+        param=param,
+        items=items,
+        item_type=item_type,
+        next=next_,
+        total=total,
+    )
+
+
+def find_functions(spec: OpenAPI, pagination: PaginationConfig | None = None):
     functions: list[FunctionSignature] = []
 
-    for path, path_item in spec.paths.items():
-        operations = [
-            ("get", path_item.get),
-            ("put", path_item.put),
-            ("post", path_item.post),
-            ("delete", path_item.delete),
-            ("options", path_item.options),
-            ("head", path_item.head),
-            ("patch", path_item.patch),
-            ("trace", path_item.trace),
-        ]
-
-        for method, op in operations:
-            if op is None or op.operation_id is None:
-                continue
-            op_id = op.operation_id
-
-            # Extract response schemas
-            schemas: set[str] = set()
-            responses = op.responses
-            for code, res in responses.items():
-                # only collect schemas with ok status because
-                # exception is raised on non ok status by
-                # res.raise_for_status in client methods
-                if isinstance(res, Reference):
-                    schemas.add(res.ref.split("/")[-1])
-                    continue
-                if 200 <= int(code) <= 299 and "application/json" in res.content:
-                    _type = res.content["application/json"].schema_
-                    if isinstance(_type, Reference):
-                        schemas.add("responses." + _type.ref.split("/")[-1])
-                    elif _type is None:
-                        schemas.add("None")
-                    else:
-                        _type = _type.items
-                        match _type:
-                            case None:
-                                schemas.add("None")
-                            case Reference():
-                                schemas.add("responses." + _type.ref.split("/")[-1])
-                            case Schema():
-                                warn(
-                                    f"Direct schema is not handled in find_functions. Falling back to Any for type:{_type}"
-                                )
-                                schemas.add("Any")
-            # Extract request body schema
-            body = None
-            if op.request_body and isinstance(op.request_body, RequestBody):
-                content = op.request_body.content
-                if "application/json" in content:
-                    _type = content["application/json"].schema_
-                    if isinstance(_type, Reference):
-                        body = "requests." + _type.ref.split("/")[-1]
-                    elif _type is not None:
+    for op in get_operation_index(spec).with_operation_id():
+        op_id = str(op.operation_id)
+
+        # Extract response schemas
+        # only collect schemas with ok status because
+        # exception is raised on non ok status by
+        # res.raise_for_status in client methods
+        schemas: list[str] = []
+        for media_type in op.json_responses.values():
+            _type = media_type.schema_
+            if isinstance(_type, Reference):
+                schema = "responses." + _type.ref.split("/")[-1]
+            elif _type is None:
+                schema = "None"
+            else:
+                _type = _type.items
+                match _type:
+                    case None:
+                        schema = "None"
+                    case Reference():
+                        schema = "list[responses." + _type.ref.split("/")[-1] + "]"
+                    case Schema():
                         warn(
                             f"Direct schema is not handled in find_functions. Falling back to Any for type:{_type}"
                         )
-                        body = "Any"
-
-            # Extract query/path parameters exists
-            is_params = [
-                p
-                for p in op.parameters
-                if isinstance(p, Parameter) and p.in_.value == "path"
-            ]
-            is_query = [
-                p
-                for p in op.parameters
-                if isinstance(p, Parameter) and p.in_.value == "query"
-            ] != []
-
-            functions.append(
-                FunctionSignature(
-                    func_name=op_id,
-                    url=path,
-                    http_method=method,
-                    return_=" | ".join(schemas) if schemas else "Any",
-                    body=body,
-                    params=(
-                        "params." + to_pascal_case(str(op_id) + "_params")
-                        if is_params
-                        else None
-                    ),
-                    query=(
-                        "queries." + to_pascal_case(str(op_id) + "_query")
-                        if is_query
-                        else None
-                    ),
-                )
+                        schema = "Any"
+            if schema not in schemas:
+                schemas.append(schema)
+        # Extract request body schema
+        body = None
+        if op.request_body:
+            content = op.request_body.content
+            if "application/json" in content:
+                _type = content["application/json"].schema_
+                if isinstance(_type, Reference):
+                    body = "requests." + _type.ref.split("/")[-1]
+                elif _type is not None:
+                    warn(
+                        f"Direct schema is not handled in find_functions. Falling back to Any for type:{_type}"
+                    )
+                    body = "Any"
+
+        # Extract query/path parameters exists
+        is_params = op.parameters[ParameterIn.PATH] != []
+        is_query = op.parameters[ParameterIn.QUERY] != []
+
+        functions.append(
+            FunctionSignature(
+                func_name=op_id,
+                url=op.path,
+                http_method=op.method,
+                return_=" | ".join(schemas) if schemas else "Any",
+                body=body,
+                params=(
+                    "params." + to_pascal_case(op_id + "_params") if is_params else None
+                ),
+                query=(
+                    "queries." + to_pascal_case(op_id + "_query") if is_query else None
+                ),
+                query_fields={
+                    q.name: bool(q.required) for q in op.parameters[ParameterIn.QUERY]
+                },
+                pagination=(
+                    find_pagination(spec, op, pagination) if pagination else None
+                ),
+                stream_item=(
+                    schemas[0][len("list[") : -1]
+                    if len(schemas) == 1 and schemas[0].startswith("list[")
+                    else None
+                ),
             )
+        )
     return functions
 
 
-def request_schemas_parser(spec: OpenAPI, operation: Operation) -> list[str]:
-    if operation.request_body is None:
+def json_schema_refs(media_type: MediaType | None) -> list[str]:
+    """
+    Returns the schemas directly referenced by the media type
+    """
+    if media_type is None or media_type.schema_ is None:
         return []
-
-    if isinstance(operation.request_body, Reference):
-        return [operation.request_body.ref.split("/")[-1]]
-
-    content = operation.request_body.content
-    schemas_list: list[str] = []
-    if "application/json" in content:
-        _type = content["application/json"].schema_
-        if isinstance(_type, Reference):
-            schemas_list.append(_type.ref.split("/")[-1])
-            for n in find_nested_schemas(spec, _type.ref):
-                schemas_list.append(n.split("/")[-1])
-            return schemas_list
-        elif _type is None:
-            return schemas_list
-        warn(
-            "Direct schema is not handled in request schemas parser. Falling back to Any"
-        )
-        return ["Any"]
-    return schemas_list
+    if isinstance(media_type.schema_, Reference):
+        return [ref_name(media_type.schema_.ref)]
+    refs: set[str] = set()
+    collect_schema_refs(media_type.schema_, refs)
+    return sorted(ref_name(r) for r in refs)
 
 
-def response_schemas_parser(spec: OpenAPI, operation: Operation) -> list[str]:
-    output: list[str] = []
-    for _, response in operation.responses.items():
-        # Handle Reference objects
-        if isinstance(response, Reference):
-            if spec.components is None:
-                continue
-            response = get_response_by_reference(spec.components, response)
-
-        # Look for application/json content
-        json_content = response.content.get("application/json")
-        if json_content is None:
-            continue
+def request_schemas_parser(operation: IndexedOperation) -> list[str]:
+    if operation.request_body is None:
+        return []
+    return json_schema_refs(operation.request_body.content.get("application/json"))
 
-        if json_content.schema_ is None:
-            continue
 
-        # Handle schema references
-        if isinstance(json_content.schema_, Reference):
-            schema_ref = json_content.schema_.ref
-            schema_name = schema_ref.split("/")[-1]
-            output.append(schema_name)
-
-            # Find nested schemas
-            for nested_ref in find_nested_schemas(spec, schema_ref):
-                nested_name = nested_ref.split("/")[-1]
-                output.append(nested_name)
-
-        # Handle schema schema
-        if isinstance(json_content.schema_, Schema):
-            itms = json_content.schema_.items
-            match itms:
-                case None:
-                    continue
-                case Reference():
-                    schema_name = itms.ref.split("/")[-1]
-                    output.append(schema_name)
-                case Schema():
-                    continue
+def response_schemas_parser(operation: IndexedOperation) -> list[str]:
+    output: list[str] = []
+    for response in operation.responses.values():
+        output.extend(json_schema_refs(response.content.get("application/json")))
     return output
 
 
 def traverse_path_methods_get(
     spec: OpenAPI, parse: Literal["requests", "response"]
 ) -> list[str]:
-    output: set[str] = set()
+    """
+    Returns the schemas used by the request or response bodies of the
+    operations, including every schema nested inside them
+    """
     if not spec.components:
         return []
 
@@ -293,72 +283,15 @@ def traverse_path_methods_get(
         case "response":
             parse_callback = response_schemas_parser
 
-    for _, path_item in spec.paths.items():
-        operations = [
-            path_item.get,
-            path_item.put,
-            path_item.post,
-            path_item.delete,
-            path_item.options,
-            path_item.head,
-            path_item.patch,
-            path_item.trace,
-        ]
-
-        for operation in operations:
-            if operation is None:
-                continue
-            output = output.union(set(parse_callback(spec, operation)))
+    roots: set[str] = set()
+    for operation in get_operation_index(spec):
+        roots.update(parse_callback(operation))
 
-    return list(output)
+    return list(get_schema_graph(spec).reachable(roots))
 
 
 def find_nested_schemas(spec: OpenAPI, schema_ref: str) -> list[str]:
-    nested_refs: set[str] = set()
-
-    if spec.components is None:
-        return list(nested_refs)
-
-    # Extract schema name from reference
-    schema_name = schema_ref.split("/")[-1]
-    schema = spec.components.schemas.get(schema_name)
-
-    if schema is None or isinstance(schema, Reference):
-        return list(nested_refs)
-
-    collect_schema_refs(schema, nested_refs)
-    return list(nested_refs)
-
-
-def collect_schema_refs(schema: Schema, refs: set[str]):
-    if schema.properties:
-        for prop_schema in schema.properties.values():
-            if isinstance(prop_schema, Reference):
-                refs.add(prop_schema.ref)
-            else:
-                collect_schema_refs(prop_schema, refs)
-
-    if schema.items:
-        if isinstance(schema.items, Reference):
-            refs.add(schema.items.ref)
-        else:
-            collect_schema_refs(schema.items, refs)
-
-    if isinstance(schema.additional_properties, Reference):
-        refs.add(schema.additional_properties.ref)
-    elif isinstance(schema.additional_properties, Schema):
-        collect_schema_refs(schema.additional_properties, refs)
-
-    for composition_list in [schema.all_of, schema.one_of, schema.any_of]:
-        if composition_list:
-            for item in composition_list:
-                if isinstance(item, Reference):
-                    refs.add(item.ref)
-                else:
-                    collect_schema_refs(item, refs)
-
-    if schema.not_:
-        if isinstance(schema.not_, Reference):
-            refs.add(schema.not_.ref)
-        else:
-            collect_schema_refs(schema.not_, refs)
+    return [
+        f"#/components/schemas/{name}"
+        for name in get_schema_graph(spec).dependencies(ref_name(schema_ref))
+    ]
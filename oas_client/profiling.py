@@ -0,0 +1,168 @@
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import Callable, Generator, Iterable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Self
+
+from pydantic import BaseModel
+
+_active: ContextVar["Profiler | None"] = ContextVar("profiler", default=None)
+
+
+class Stage(BaseModel):
+    """
+    A finished stage of the generation. peak_bytes is the peak of the
+    memory traced by tracemalloc while the stage ran.
+    """
+
+    name: str
+    depth: int
+    start: float
+    seconds: float
+    peak_bytes: int | None = None
+
+
+class _Frame:
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.start = time.perf_counter()
+        self.peak = 0
+
+
+class Profiler:
+    """
+    Records the time and peak memory of every stage run while the
+    profiler is active. Stages can be nested. Each callback is called
+    with a stage when it finishes.
+
+        with Profiler(callbacks=[print]):
+            render_modules(spec, template_dir)
+    """
+
+    def __init__(
+        self,
+        callbacks: Iterable[Callable[[Stage], None]] = (),
+        trace_memory: bool = True,
+        cprofile: bool = False,
+    ):
+        self.callbacks = list(callbacks)
+        self.trace_memory = trace_memory
+        self.stages: list[Stage] = []
+        self.profile = cProfile.Profile() if cprofile else None
+        self._stack: list[_Frame] = []
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+
+    def __enter__(self) -> Self:
+        self._token = _active.set(self)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profile is not None:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc: object):
+        if self.profile is not None:
+            self.profile.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        _active.reset(self._token)
+
+    def _update_peaks(self) -> int | None:
+        if not tracemalloc.is_tracing():
+            return None
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            frame.peak = max(frame.peak, peak)
+        return peak
+
+    @contextmanager
+    def stage(self, name: str) -> Generator[None, None, None]:
+        # the peak seen so far belongs to the enclosing stages, the meter is
+        # reset so this stage only sees its own
+        self._update_peaks()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        frame = _Frame(name, len(self._stack))
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - frame.start
+            peak = self._update_peaks()
+            self._stack.pop()
+            result = Stage(
+                name=name,
+                depth=frame.depth,
+                start=frame.start - self._origin,
+                seconds=seconds,
+                peak_bytes=None if peak is None else frame.peak,
+            )
+            self.stages.append(result)
+            for callback in self.callbacks:
+                callback(result)
+
+    def table(self) -> str:
+        """
+        Returns the stages as a table, in the order they started
+        """
+        rows = [("stage", "time (ms)", "peak memory (MB)")]
+        for s in sorted(self.stages, key=lambda s: s.start):
+            rows.append(
+                (
+                    "  " * s.depth + s.name,
+                    f"{s.seconds * 1000:.1f}",
+                    "-" if s.peak_bytes is None else f"{s.peak_bytes / 1e6:.1f}",
+                )
+            )
+        width = max(len(r[0]) for r in rows)
+        return "\n".join(f"{r[0]:<{width}}  {r[1]:>10}  {r[2]:>16}" for r in rows)
+
+    def dump_stats(self, path: Path):
+        """
+        Writes the cProfile statistics, readable with pstats
+        """
+        if self.profile is None:
+            raise ValueError("Profiler was created without cprofile=True")
+        self.profile.dump_stats(path)
+
+    def dump_chrome_trace(self, path: Path):
+        """
+        Writes the stages in the Chrome trace event format, viewable in
+        chrome://tracing or Perfetto
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": s.name,
+                "ph": "X",
+                "ts": s.start * 1e6,
+                "dur": s.seconds * 1e6,
+                "pid": pid,
+                "tid": 0,
+                "args": {"peak_bytes": s.peak_bytes},
+            }
+            for s in self.stages
+        ]
+        path.write_text(json.dumps({"traceEvents": events}))
+
+
+@contextmanager
+def stage(name: str) -> Generator[None, None, None]:
+    """
+    Records a stage in the active profiler, does nothing without one
+    """
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
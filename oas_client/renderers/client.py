@@ -1,18 +1,116 @@
+import re
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader
-
 from oas_client.openapi import OpenAPI
-from oas_client.parser import find_functions
+from oas_client.parser import find_functions, find_structs
+from oas_client.renderers.environment import get_renderer
+from oas_client.types import PaginationConfig, decodable_type
+
+
+def path_fstring(url: str, params: str, by_key: bool) -> str:
+    """
+    Returns an f-string building the url from the path parameters, read
+    by key from a dict or by attribute from a model
+    """
+
+    def field(match: re.Match[str]) -> str:
+        name = match.group(1)
+        return f"{{{params}[{name!r}]}}" if by_key else f"{{{params}.{name}}}"
+
+    return 'f"' + re.sub(r"{([^{}]+)}", field, url) + '"'
 
 
-def render_client(spec: OpenAPI, template_dir: Path, model_to_use: str) -> str:
-    env = Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True,
+def render_client(
+    spec: OpenAPI,
+    template_dir: Path,
+    model_to_use: str,
+    pagination: PaginationConfig | None = None,
+    runtime: str = ".",
+) -> str:
+    """
+    Renders the client module, runtime is the relative package of the
+    cache, hooks, lazy and stream modules
+    """
+    template = get_renderer(template_dir).get_template("client.jinja2")
+    functions = find_functions(spec, pagination)
+    if model_to_use == "msgspec":
+        # a decoder of a union of several structs raises at import
+        structs = find_structs(spec)
+        functions = [
+            func.model_copy(
+                update={
+                    "return_": decodable_type(func.return_, structs),
+                    "stream_item": func.stream_item
+                    and decodable_type(func.stream_item, structs),
+                }
+            )
+            for func in functions
+        ]
+    # one cached msgspec decoder or pydantic adapter per distinct return type
+    decoders: dict[str, str] = {}
+    if model_to_use in ("msgspec", "pydantic"):
+        for func in functions:
+            decoders.setdefault(func.return_, f"_decoder_{len(decoders)}")
+    # the models defer their build to the first validation, adapters of
+    # other types, like a list of models, are deferred with their config
+    deferred = {
+        return_
+        for return_ in decoders
+        if model_to_use == "pydantic"
+        and "responses." in return_
+        and not re.fullmatch(r"responses\.\w+", return_)
+    }
+
+    # schema modules referenced by the methods, others are not imported
+    modules = [
+        name
+        for name, used in [
+            ("params", any(f.params for f in functions)),
+            ("queries", any(f.query for f in functions)),
+            ("requests", any(f.body for f in functions)),
+            ("responses", any("responses." in f.return_ for f in functions)),
+        ]
+        if used
+    ]
+
+    return template.render(
+        functions=functions,
+        model_used=model_to_use,
+        decoders=decoders,
+        deferred=deferred,
+        paginated=any(f.pagination for f in functions),
+        streamed=any(f.stream_item for f in functions),
+        modules=modules,
+        runtime=runtime,
+        path_fstring=path_fstring,
     )
-    template = env.get_template("client.jinja2")
-    functions = find_functions(spec)
 
-    return template.render(functions=functions, model_used=model_to_use)
+
+def render_facade(template_dir: Path, methods: dict[str, str], tags: list[str]) -> str:
+    """
+    Renders the client that loads the methods of each tag package on
+    first access
+    """
+    template = get_renderer(template_dir).get_template("facade.jinja2")
+    # natural order, like isort sorts the imports of the tag packages
+    import_order = sorted(
+        tags,
+        key=lambda t: [int(p) if p.isdigit() else p for p in re.split(r"(\d+)", t)],
+    )
+    return template.render(methods=methods, tags=tags, import_order=import_order)
+
+
+def render_cache(template_dir: Path) -> str:
+    return get_renderer(template_dir).get_template("cache.jinja2").render()
+
+
+def render_hooks(template_dir: Path) -> str:
+    return get_renderer(template_dir).get_template("hooks.jinja2").render()
+
+
+def render_lazy(template_dir: Path) -> str:
+    return get_renderer(template_dir).get_template("lazy.jinja2").render()
+
+
+def render_stream(template_dir: Path) -> str:
+    return get_renderer(template_dir).get_template("stream.jinja2").render()
@@ -0,0 +1,80 @@
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+from oas_client.utils import get_cache_dir
+
+LINE_LENGTH = 88
+
+
+def wrap(indent: int, head: str, items: list[str], tail: str) -> str:
+    """
+    Lays out a bracketed list of items like ruff format does: on one line
+    if it fits, else the items on their own line, else one item per line.
+    head ends with the opening bracket and tail starts with the closing one.
+    """
+    pad = " " * indent
+    line = f"{pad}{head}{', '.join(items)}{tail}"
+    if len(line) <= LINE_LENGTH:
+        return line
+    inner = f"{pad}    {', '.join(items)}"
+    # ruff always puts a trailing comma after the only parameter of a def
+    single_param = len(items) == 1 and head.startswith(("def ", "async def "))
+    if (
+        not single_param
+        and len(inner) <= LINE_LENGTH
+        and len(pad + tail) <= LINE_LENGTH
+    ):
+        return f"{pad}{head}\n{inner}\n{pad}{tail}"
+    lines = "".join(f"{pad}    {item},\n" for item in items)
+    return f"{pad}{head}\n{lines}{pad}{tail}"
+
+
+def is_formatted(code: str) -> bool:
+    """
+    Returns whether ruff format would leave the rendered code unchanged.
+    The templates lay out the code like ruff does, only lines too long to
+    fit, long type annotations for example, are left for ruff to split.
+    """
+    return all(len(line) <= LINE_LENGTH for line in code.splitlines())
+
+
+class Renderer:
+    """
+    Owns the jinja environment shared by every renderer. Templates are
+    compiled once per environment and the compiled bytecode is cached on
+    disk, so later runs skip compilation entirely.
+    """
+
+    def __init__(self, template_dir: Path, cache_dir: Path | None = None):
+        bytecode_cache = None
+        if cache_dir is not None:
+            bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            bytecode_cache=bytecode_cache,
+        )
+        # jinja types the globals with the values of its default ones
+        env_globals: dict[str, Any] = self.env.globals
+        env_globals["wrap"] = wrap
+
+    def get_template(self, name: str) -> Template:
+        return self.env.get_template(name)
+
+    def precompile(self) -> list[str]:
+        """
+        Compiles every template into the bytecode cache
+        """
+        names = self.env.list_templates(extensions=["jinja2"])
+        for name in names:
+            self.env.get_template(name)
+        return names
+
+
+@cache
+def get_renderer(template_dir: Path) -> Renderer:
+    return Renderer(template_dir, get_cache_dir("jinja"))
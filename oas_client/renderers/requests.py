@@ -1,10 +1,21 @@
+from collections.abc import Collection
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader
-
 from oas_client.openapi import OpenAPI
 from oas_client.parser import find_schemas, traverse_path_methods_get
-from oas_client.utils import render_imports
+from oas_client.renderers.schemas import render_schemas
+from oas_client.types import ParserOutput
+
+
+def find_request_schemas(
+    spec: OpenAPI, schema_cls_type: str, names: Collection[str] | None = None
+) -> list[ParserOutput]:
+    # render necessary schemas only
+    if names is None:
+        names = set(traverse_path_methods_get(spec, "requests"))
+    return find_schemas(
+        spec, partial=True, schema_cls_type=schema_cls_type, names=names
+    )
 
 
 def render_requests(
@@ -12,16 +23,8 @@ def render_requests(
     template_dir: Path,
     imports: set[tuple[str, str]],
     schema_cls_type: str,
+    schemas: list[ParserOutput] | None = None,
 ) -> str:
-    schemas = find_schemas(spec, partial=True, schema_cls_type=schema_cls_type)
-    # render necessary schemas only
-    request_schemas = traverse_path_methods_get(spec, "requests")
-    schemas = [s for s in schemas if s.name in request_schemas]
-    env = Environment(
-        loader=FileSystemLoader(template_dir),
-        trim_blocks=True,
-        lstrip_blocks=True,
-    )
-    template = env.get_template("schemas.jinja2")
-    output_code = template.render(schemas=schemas, imports=render_imports(imports))
-    return output_code
+    if schemas is None:
+        schemas = find_request_schemas(spec, schema_cls_type)
+    return render_schemas(template_dir, schemas, imports)
@@ -0,0 +1,68 @@
+import re
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from jinja2 import Template
+
+from oas_client.renderers.environment import get_renderer
+from oas_client.types import ParserOutput
+from oas_client.utils import render_imports
+
+
+def render_schemas(
+    template_dir: Path, schemas: list[ParserOutput], imports: set[tuple[str, str]]
+) -> str:
+    template = get_renderer(template_dir).get_template("schemas.jinja2")
+    rendered: list[str] = []
+    used: set[str] = set()
+    for i, schema in enumerate(schemas):
+        # the spacing of literals depends on their position
+        first = i == 0 and schema.type == "Literal"
+        code, names = render_schema(template, schema_key(schema), first)
+        rendered.append(code)
+        used.update(names)
+    return template.render(
+        schemas=rendered,
+        imports=render_imports(
+            {(module, item) for module, item in imports if item in used}
+        ),
+    )
+
+
+def schema_key(schema: ParserOutput) -> tuple[Any, ...]:
+    """
+    Returns a hashable copy of the schema
+    """
+    fields = tuple(
+        f if isinstance(f, str) else (f["name"], f["type"], f.get("value"))
+        for f in schema.fields
+    )
+    return schema.name, schema.type, fields
+
+
+@lru_cache(maxsize=1 << 16)
+def render_schema(
+    template: Template, key: tuple[Any, ...], first: bool
+) -> tuple[str, frozenset[str]]:
+    """
+    Returns the code of the schema and the names it references, so the
+    rendered module has no unused import to lint away. Schemas used by
+    several modules, the tag packages or the generations of --watch, are
+    rendered once. The template is part of the key, it is a new object
+    when the template file is reloaded.
+    """
+    name, type_, fields = key
+    if type_ != "Literal":
+        fields = [{"name": n, "type": t, "value": v} for n, t, v in fields]
+    schema = {"name": name, "type": type_, "fields": fields}
+    used = {type_}
+    for field in fields:
+        if isinstance(field, str):
+            continue
+        for k in ("type", "value"):
+            used.update(re.findall(r"[A-Za-z_]\w*", field[k] or ""))
+    # the macros of the template module are unknown to type checkers
+    macro: Callable[..., Any] = getattr(template.module, "render_schema")  # noqa: B009
+    return str(macro(schema, first)), frozenset(used)
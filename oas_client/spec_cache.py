@@ -0,0 +1,124 @@
+import gc
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+from oas_client import __version__
+from oas_client.openapi import OpenAPI
+from oas_client.profiling import stage
+from oas_client.utils import get_cache_dir
+
+# entries beyond these limits are evicted, least recently used first
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+MAX_CACHE_AGE = 30 * 24 * 60 * 60
+
+
+class SpecCache:
+    """
+    Stores validated specs on disk, keyed by the hash of the spec content
+    and the oas-client version, so an unchanged spec is validated once.
+    Entries are compressed pickles of the OpenAPI model.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = MAX_CACHE_BYTES,
+        max_age: float = MAX_CACHE_AGE,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def path(self, spec_bytes: bytes) -> Path:
+        h = hashlib.sha256(__version__.encode())
+        h.update(hashlib.sha256(spec_bytes).digest())
+        return self.cache_dir / f"{h.hexdigest()}.pickle"
+
+    def get(self, spec_bytes: bytes) -> OpenAPI | None:
+        path = self.path(spec_bytes)
+        try:
+            data = zlib.decompress(path.read_bytes())
+            # unpickling allocates millions of objects, collecting them
+            # midway only slows it down
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                spec = pickle.loads(data)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+            # refresh the access time used for eviction
+            os.utime(path)
+        except OSError:
+            # missing or unreadable
+            return None
+        except (pickle.UnpicklingError, zlib.error, EOFError):
+            # corrupted, the entry is written again after validation
+            path.unlink(missing_ok=True)
+            return None
+        return spec if isinstance(spec, OpenAPI) else None
+
+    def put(self, spec_bytes: bytes, spec: OpenAPI):
+        data = zlib.compress(
+            pickle.dumps(spec, protocol=pickle.HIGHEST_PROTOCOL), level=1
+        )
+        try:
+            # write then rename, so concurrent runs never read a partial entry
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path(spec_bytes))
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        Removes entries older than max_age, then the least recently used
+        entries until the cache fits in max_bytes
+        """
+        entries: list[tuple[float, int, Path]] = []
+        now = time.time()
+        for path in self.cache_dir.glob("*.pickle"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if now - st.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def load_spec(spec_bytes: bytes, use_cache: bool = True) -> OpenAPI:
+    """
+    Returns the validated spec, from the spec cache when possible
+    """
+    cache_dir = get_cache_dir("specs") if use_cache else None
+    cache = SpecCache(cache_dir) if cache_dir is not None else None
+    if cache is not None:
+        with stage("spec_cache"):
+            spec = cache.get(spec_bytes)
+        if spec is not None:
+            return spec
+
+    with stage("json_load"):
+        spec_json = json.loads(spec_bytes)
+    with stage("validate"):
+        spec = OpenAPI(**spec_json)
+    if cache is not None:
+        with stage("spec_cache_write"):
+            cache.put(spec_bytes, spec)
+    return spec
@@ -0,0 +1,94 @@
+from collections.abc import Collection, Iterable
+from fnmatch import fnmatchcase
+from warnings import warn
+
+from oas_client.constants import HTTP_METHODS
+from oas_client.exceptions import SelectionError
+from oas_client.graph import get_schema_graph
+from oas_client.index import IndexedOperation, get_operation_index
+from oas_client.ir import get_schema_ir
+from oas_client.openapi import OpenAPI, Operation
+from oas_client.parser import request_schemas_parser, response_schemas_parser
+
+
+def subset_spec(spec: OpenAPI, operations: Iterable[IndexedOperation]) -> OpenAPI:
+    """
+    Returns a copy of the spec with only the given operations and the
+    component schemas reachable from them
+    """
+    selected: dict[str, dict[str, Operation]] = {}
+    roots: set[str] = set()
+    for op in operations:
+        selected.setdefault(op.path, {})[op.method] = op.operation
+        roots.update(request_schemas_parser(op))
+        roots.update(response_schemas_parser(op))
+
+    paths = {
+        path: spec.paths[path].model_copy(
+            update={**{m: None for m in HTTP_METHODS}, **methods}
+        )
+        for path, methods in selected.items()
+    }
+    components = spec.components
+    if components is not None:
+        reachable = get_schema_graph(spec).reachable(roots)
+        components = components.model_copy(
+            update={
+                "schemas": {
+                    name: schema
+                    for name, schema in components.schemas.items()
+                    if name in reachable
+                }
+            }
+        )
+    subset = spec.model_copy(update={"paths": paths, "components": components})
+    # the copy shares the private attributes of the spec, derived
+    # structures must be rebuilt for the subset. The schema objects are
+    # shared, so their resolved types are kept, and the subset holds every
+    # schema reachable from its operations, so the graph is kept too.
+    subset._cache = {
+        "schema_ir": get_schema_ir(spec),
+        "schema_graph": get_schema_graph(spec),
+    }
+    return subset
+
+
+def select_operations(
+    spec: OpenAPI,
+    include_tags: Collection[str] = (),
+    include_operations: Collection[str] = (),
+    exclude_tags: Collection[str] = (),
+    exclude_operations: Collection[str] = (),
+) -> list[IndexedOperation]:
+    """
+    Returns the operations having an included tag or operation id, all of
+    them when nothing is included, without the excluded ones. Operation
+    ids can be shell style patterns, like users_*. Raises SelectionError
+    when no operation is left.
+    """
+
+    def matches(
+        op: IndexedOperation, tags: Collection[str], ids: Collection[str]
+    ) -> bool:
+        return any(t in tags for t in op.operation.tags) or any(
+            fnmatchcase(op.operation_id or "", pattern) for pattern in ids
+        )
+
+    operations = get_operation_index(spec).operations
+    for tag in include_tags:
+        if not any(tag in op.operation.tags for op in operations):
+            warn(f"No operation has the included tag {tag}")
+    for pattern in include_operations:
+        if not any(fnmatchcase(op.operation_id or "", pattern) for op in operations):
+            warn(f"No operation id matches the included operation {pattern}")
+
+    if include_tags or include_operations:
+        operations = [
+            op for op in operations if matches(op, include_tags, include_operations)
+        ]
+    operations = [
+        op for op in operations if not matches(op, exclude_tags, exclude_operations)
+    ]
+    if not operations:
+        raise SelectionError("No operation is selected by the given options.")
+    return operations
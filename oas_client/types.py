@@ -1,9 +1,25 @@
+import re
+from collections.abc import Collection
+from typing import Literal
 from warnings import warn
 
 from pydantic import BaseModel
 
 from oas_client.openapi import Reference, Schema
 
+# names of the generated types that are not schemas
+BUILTIN_TYPES = {
+    "Any",
+    "None",
+    "UnsetType",
+    "bool",
+    "dict",
+    "float",
+    "int",
+    "list",
+    "str",
+}
+
 
 class ParserOutput(BaseModel):
     name: str
@@ -11,6 +27,31 @@ class ParserOutput(BaseModel):
     type: str
 
 
+class PaginationConfig(BaseModel):
+    """
+    Names of the query parameters and response fields used to detect
+    paginated operations
+    """
+
+    items: list[str] = ["items", "results", "data"]
+    total: list[str] = ["count", "total"]
+    offset: list[str] = ["offset"]
+    page: list[str] = ["page"]
+    cursor: list[str] = ["cursor"]
+    next: list[str] = ["next", "next_cursor"]
+
+
+class Pagination(BaseModel):
+    style: Literal["offset", "page", "cursor"]
+    # query parameter advanced on every page
+    param: str
+    # response fields
+    items: str
+    item_type: str
+    next: str | None
+    total: str | None
+
+
 class FunctionSignature(BaseModel):
     func_name: str
     url: str
@@ -19,6 +60,98 @@ class FunctionSignature(BaseModel):
     body: str | None
     params: str | None
     query: str | None
+    # query parameter names, with whether they are required
+    query_fields: dict[str, bool] = {}
+    pagination: Pagination | None = None
+    # item type of responses that are a json array, streamed item by item
+    stream_item: str | None = None
+
+
+def make_optional(field: dict[str, str], type_str: str, cls_type: str) -> str:
+    """
+    Returns the type of a field that can be left out and sets its
+    default value when the class type needs one
+    """
+    if cls_type == "BaseModel":
+        field["value"] = "None"
+        members = [t.strip() for t in type_str.strip("\"'").split("|")]
+        if "None" not in members:
+            type_str = f"{type_str} | None"
+    elif cls_type == "Struct":
+        # unset fields are omitted when the struct is encoded
+        field["value"] = "UNSET"
+        type_str = f"{type_str} | UnsetType"
+    else:
+        return f"NotRequired[{type_str}]"
+    if '"' in type_str:
+        # forward references can not be used in a runtime union
+        type_str = '"' + type_str.replace('"', "").replace("'", "") + '"'
+    return type_str
+
+
+def split_union(type_str: str) -> list[str]:
+    """
+    Returns the members of a union type, unions nested in brackets are
+    not split
+    """
+    members: list[str] = []
+    depth = start = 0
+    for i, c in enumerate(type_str):
+        if c == "[":
+            depth += 1
+        elif c == "]":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            members.append(type_str[start:i].strip())
+            start = i + 1
+    members.append(type_str[start:].strip())
+    return members
+
+
+def decodable_type(type_str: str, structs: Collection[str]) -> str:
+    """
+    Returns the type msgspec can decode. msgspec tells the members of a
+    union apart by their json type only, so several objects, structs or
+    dicts, are merged into dict[str, Any] and several arrays into
+    list[Any]. structs are the names of the struct schemas.
+    """
+    plain = type_str.replace('"', "")
+    members = split_union(plain)
+    objects = [
+        m for m in members if m.startswith("dict[") or m.split(".")[-1] in structs
+    ]
+    arrays = [m for m in members if m.startswith("list[")]
+    if len(objects) > 1:
+        members = merge_members(members, objects, "dict[str, Any]")
+    if len(arrays) > 1:
+        members = merge_members(members, arrays, "list[Any]")
+    else:
+        # the items of an array can be a union too
+        members = [
+            f"list[{decodable_type(m[5:-1], structs)}]" if m.startswith("list[") else m
+            for m in members
+        ]
+    decodable = " | ".join(members)
+    if decodable == plain:
+        return type_str
+    names = set(re.findall(r"[A-Za-z_]\w*", decodable)) - BUILTIN_TYPES
+    if '"' in type_str and names:
+        # forward references can not be used in a runtime union
+        decodable = f'"{decodable}"'
+    return decodable
+
+
+def merge_members(members: list[str], merged: list[str], into: str) -> list[str]:
+    """
+    Returns members with the merged ones replaced by into, at the place
+    of the first one
+    """
+    first = members.index(merged[0])
+    return [
+        into if i == first else m
+        for i, m in enumerate(members)
+        if i == first or m not in merged
+    ]
 
 
 def resolve_type(prop: Reference | Schema | None) -> str:
@@ -43,9 +176,9 @@ def resolve_type(prop: Reference | Schema | None) -> str:
             # for example:
             # t : "Atype" | None
             # 1. t -> Atype | None : by .replace
-            # 2. t -> "Atype | None" : by .__repr__
+            # 2. t -> "Atype | None" : by quoting it again
 
-            temp_type = temp_type.replace('"', "").__repr__()
+            temp_type = '"' + temp_type.replace('"', "") + '"'
         return temp_type
     t: str | None = prop.type
     if t == "string":
@@ -1,7 +1,19 @@
+import keyword
+import os
+import re
+import sys
 from collections import defaultdict
+from pathlib import Path
 
 from oas_client.exceptions import ReferenceNotResolved
-from oas_client.openapi import Components, Reference, Response, Schema
+from oas_client.openapi import (
+    Components,
+    Parameter,
+    Reference,
+    RequestBody,
+    Response,
+    Schema,
+)
 
 
 def to_pascal_case(s: str) -> str:
@@ -9,6 +21,36 @@ def to_pascal_case(s: str) -> str:
     return "".join(p[0].upper() + p[1:] if p else p for p in parts)
 
 
+def to_identifier(s: str) -> str:
+    """
+    Converts a name, a tag for example, to a valid python identifier
+    """
+    identifier = re.sub(r"\W+", "_", s).strip("_").lower()
+    if not identifier:
+        return "default"
+    if identifier[0].isdigit() or keyword.iskeyword(identifier):
+        identifier = f"_{identifier}"
+    return identifier
+
+
+def get_cache_dir(name: str) -> Path | None:
+    """
+    Returns a writable cache directory for oas-client, None if it can not
+    be created. Defaults to $XDG_CACHE_HOME/oas-client and can be changed
+    with $OAS_CLIENT_CACHE_DIR.
+    """
+    base = os.environ.get("OAS_CLIENT_CACHE_DIR")
+    if base is None:
+        xdg_cache = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        base = Path(xdg_cache) / "oas-client"
+    cache_dir = Path(base) / name
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return cache_dir
+
+
 def render_imports(imports: set[tuple[str, str]]):
     """
     Groups and sorts imports and prints Python import statements.
@@ -22,12 +64,20 @@ def render_imports(imports: set[tuple[str, str]]):
     for module, item in imports:
         grouped[module].append(item)
 
-    output: list[str] = []
+    # standard library imports first, then third party ones, like isort
+    sections: tuple[list[str], list[str]] = ([], [])
     for module in sorted(grouped):
-        items = sorted(grouped[module])
-        output.append(f"from {module} import {', '.join(items)}")
+        # constants, then classes, then the rest, like isort
+        items = sorted(
+            grouped[module],
+            key=lambda i: (0 if i.isupper() else 1 if i[0].isupper() else 2, i),
+        )
+        is_stdlib = module.split(".")[0] in sys.stdlib_module_names
+        sections[0 if is_stdlib else 1].append(
+            f"from {module} import {', '.join(items)}"
+        )
 
-    return "\n".join(output)
+    return "\n\n".join("\n".join(s) for s in sections if s)
 
 
 def get_schema_by_reference(component: Components, ref: Reference) -> Schema:
@@ -40,9 +90,29 @@ def get_schema_by_reference(component: Components, ref: Reference) -> Schema:
 
 
 def get_response_by_reference(component: Components, ref: Reference) -> Response:
-    # pattern = #/components/schemas/PagedServerSchema
+    # pattern = #/components/responses/NotFound
     response_name = ref.ref.split("/")[-1]
-    response = component.schemas.get(response_name, None)
+    response = component.responses.get(response_name, None)
     if isinstance(response, Response):
         return response
-    raise ReferenceNotResolved(f"Could not find matching schema for Reference:{ref}")
+    raise ReferenceNotResolved(f"Could not find matching response for Reference:{ref}")
+
+
+def get_parameter_by_reference(component: Components, ref: Reference) -> Parameter:
+    # pattern = #/components/parameters/PageParam
+    parameter_name = ref.ref.split("/")[-1]
+    parameter = component.parameters.get(parameter_name, None)
+    if isinstance(parameter, Parameter):
+        return parameter
+    raise ReferenceNotResolved(f"Could not find matching parameter for Reference:{ref}")
+
+
+def get_request_body_by_reference(component: Components, ref: Reference) -> RequestBody:
+    # pattern = #/components/requestBodies/CreateServer
+    request_body_name = ref.ref.split("/")[-1]
+    request_body = component.request_bodies.get(request_body_name, None)
+    if isinstance(request_body, RequestBody):
+        return request_body
+    raise ReferenceNotResolved(
+        f"Could not find matching request body for Reference:{ref}"
+    )
@@ -0,0 +1,132 @@
+import gc
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+from jinja2 import TemplateError
+from pydantic import BaseModel
+
+from oas_client.exceptions import OASException
+from oas_client.generator import TagPackage
+from oas_client.ir import get_schema_ir
+from oas_client.openapi import OpenAPI, Reference
+from oas_client.profiling import stage
+from oas_client.spec_cache import load_spec
+
+# errors an edit of the spec or the templates can cause. Validation and
+# json errors are ValueErrors, unsupported schemas raise
+# NotImplementedError and an empty selection raises SelectionError.
+GENERATION_ERRORS = (
+    OASException,
+    ValueError,
+    NotImplementedError,
+    OSError,
+    TemplateError,
+    httpx.HTTPError,
+)
+
+
+def reuse_models(
+    model: BaseModel, previous_json: dict[str, Any], spec_json: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    Returns spec_json with the values that did not change since
+    previous_json replaced by their validated models in model. Maps, like
+    the paths or the component schemas, are reused entry by entry.
+    """
+    fields = {
+        field.alias or name: getattr(model, name)
+        for name, field in type(model).model_fields.items()
+    }
+    data: dict[str, Any] = {}
+    for key, value in spec_json.items():
+        previous = previous_json.get(key)
+        current = fields.get(key)
+        if key in fields and previous == value:
+            data[key] = current
+        elif not (isinstance(previous, dict) and isinstance(value, dict)):
+            data[key] = value
+        elif isinstance(current, BaseModel):
+            data[key] = reuse_models(current, previous, value)
+        elif isinstance(current, dict):
+            data[key] = {
+                k: current[k] if k in current and previous.get(k) == v else v
+                for k, v in value.items()
+            }
+        else:
+            data[key] = value
+    return data
+
+
+def revalidate_spec(
+    previous: OpenAPI, previous_json: dict[str, Any], spec_json: dict[str, Any]
+) -> OpenAPI:
+    """
+    Validates a new version of the spec, only the parts whose JSON changed
+    are validated again, the models of the other ones are shared with the
+    previous version
+    """
+    return OpenAPI(**reuse_models(previous, previous_json, spec_json))
+
+
+class WatchState:
+    """
+    Keeps the last spec, its JSON, its resolved schemas and the rendered
+    tag packages in memory between the generations of --watch, so a
+    change of the spec only costs the parts it touches
+    """
+
+    def __init__(self):
+        self.spec: OpenAPI | None = None
+        self.spec_json: dict[str, Any] = {}
+        self.packages: dict[str, TagPackage] = {}
+
+    def load_spec(self, spec_bytes: bytes, use_cache: bool = True) -> OpenAPI:
+        with stage("json_load"):
+            spec_json = json.loads(spec_bytes)
+        previous = self.spec
+        if previous is None:
+            spec = load_spec(spec_bytes, use_cache=use_cache)
+        else:
+            with stage("revalidate"):
+                spec = revalidate_spec(previous, self.spec_json, spec_json)
+            if spec.components and previous.components:
+                before = previous.components.schemas
+                # aliases are resolved again, their target may have changed
+                unchanged = {
+                    name
+                    for name, schema in spec.components.schemas.items()
+                    if before.get(name) is schema and not isinstance(schema, Reference)
+                }
+                get_schema_ir(spec).reuse(get_schema_ir(previous), unchanged)
+        self.spec, self.spec_json = spec, spec_json
+        return spec
+
+
+def watch(version: Callable[[], Any], interval: float, on_change: Callable[[], None]):
+    """
+    Calls on_change now and whenever the version of the spec changes,
+    polling it every interval seconds. A changed version has to stay the
+    same for one interval, so a spec being written is not read halfway.
+    Errors are printed and the spec is watched again, so a broken edit can
+    be fixed without a restart.
+    """
+    last = pending = None
+    while True:
+        try:
+            current = version()
+            if current != last and (last is None or current == pending):
+                last = current
+                on_change()
+                # the spec and the caches outlive the generation, moving them
+                # out of the collected generations keeps the collections of
+                # the next generation short
+                gc.unfreeze()
+                gc.collect()
+                gc.freeze()
+            pending = current
+        except GENERATION_ERRORS as e:
+            print(f"Generation failed: {e}")
+        time.sleep(interval)
@@ -0,0 +1,154 @@
+import gzip
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from oas_client.download import CachedResponse, DownloadCache, download_spec
+
+SPEC = (Path(__file__).parent / "spec.json").read_bytes()
+
+
+class SpecServer(ThreadingHTTPServer):
+    """
+    Serves a spec with the configured validators and records the headers
+    of every request
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SpecHandler)
+        self.body = SPEC
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.gzip = False
+        self.requests: list[dict[str, str]] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}/spec.json"
+
+
+class SpecHandler(BaseHTTPRequestHandler):
+    server: SpecServer
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if (server.etag and self.headers["If-None-Match"] == server.etag) or (
+            server.last_modified
+            and self.headers["If-Modified-Since"] == server.last_modified
+        ):
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = server.body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if server.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        if server.etag:
+            self.send_header("ETag", server.etag)
+        if server.last_modified:
+            self.send_header("Last-Modified", server.last_modified)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object):
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[SpecServer]:
+    server = SpecServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_not_modified_returns_the_cached_body(tmp_path: Path, server: SpecServer):
+    server.etag = '"v1"'
+    cache = DownloadCache(tmp_path)
+    assert cache.fetch(server.url) == SPEC
+    # a 304 while the etag matches, the new body is not downloaded
+    server.body = b"{}"
+    assert cache.fetch(server.url) == SPEC
+    assert server.requests[0].get("If-None-Match") is None
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+
+
+def test_compressed_body_is_stored_decompressed(tmp_path: Path, server: SpecServer):
+    """
+    The body is decompressed while it is streamed to the cache directory,
+    the 304 that follows reads it back from there
+    """
+    server.gzip = True
+    server.last_modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+    cache = DownloadCache(tmp_path)
+    assert cache.fetch(server.url) == SPEC
+    meta_path, body_path = cache.paths(server.url)
+    assert body_path.read_bytes() == SPEC
+    assert not list(tmp_path.glob("*.tmp"))
+
+    assert cache.fetch(server.url) == SPEC
+    assert server.requests[1]["If-Modified-Since"] == server.last_modified
+    meta = CachedResponse.model_validate_json(meta_path.read_bytes())
+    assert meta == CachedResponse(url=server.url, last_modified=server.last_modified)
+
+
+def test_without_validators_the_spec_is_downloaded_again(
+    tmp_path: Path, server: SpecServer
+):
+    server.etag = '"v1"'
+    cache = DownloadCache(tmp_path)
+    cache.fetch(server.url)
+    meta_path, _ = cache.paths(server.url)
+    assert meta_path.exists()
+
+    # the previous validators are dropped with the response not having any
+    server.etag = None
+    server.body = b"{}"
+    assert cache.fetch(server.url) == b"{}"
+    assert not meta_path.exists()
+    assert cache.get(server.url) is None
+    assert cache.fetch(server.url) == b"{}"
+    assert server.requests[2].get("If-None-Match") is None
+
+
+@pytest.mark.parametrize("damage", ["corrupt", "other_url", "no_body"])
+def test_unusable_metadata_is_ignored(tmp_path: Path, server: SpecServer, damage: str):
+    server.etag = '"v1"'
+    cache = DownloadCache(tmp_path)
+    cache.fetch(server.url)
+    meta_path, body_path = cache.paths(server.url)
+    if damage == "corrupt":
+        meta_path.write_text("{")
+    elif damage == "other_url":
+        meta_path.write_text(CachedResponse(url="http://other").model_dump_json())
+    else:
+        body_path.unlink()
+
+    assert cache.get(server.url) is None
+    assert cache.fetch(server.url) == SPEC
+    assert server.requests[1].get("If-None-Match") is None
+
+
+def test_download_spec_caches_only_when_asked(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, server: SpecServer
+):
+    monkeypatch.setenv("OAS_CLIENT_CACHE_DIR", str(tmp_path))
+    server.etag = '"v1"'
+    assert download_spec(server.url, use_cache=False) == SPEC
+    assert not (tmp_path / "downloads").exists()
+    assert download_spec(server.url) == SPEC
+    assert download_spec(server.url) == SPEC
+    assert [r.get("If-None-Match") for r in server.requests] == [None, None, '"v1"']
@@ -0,0 +1,40 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from oas_client.renderers.environment import is_formatted
+
+SPEC = Path(__file__).parent / "spec.json"
+
+
+@pytest.mark.skipif(shutil.which("ruff") is None, reason="ruff is not installed")
+@pytest.mark.parametrize("split", [False, True], ids=["package", "split-by-tag"])
+@pytest.mark.parametrize("mode", ["typeddict", "pydantic", "msgspec"])
+def test_rendered_code_is_formatted(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mode: str, split: bool
+):
+    """
+    ruff only runs on the modules is_formatted rejects, the other ones
+    must already be laid out like ruff format does
+    """
+    monkeypatch.setenv("OAS_CLIENT_CACHE_DIR", str(tmp_path / "cache"))
+    output_dir = tmp_path / "client"
+    args = [str(SPEC), "--output-dir", str(output_dir), "--mode", mode]
+    args += ["--no-formatting", "--no-spec-cache"]
+    if split:
+        args.append("--split-by-tag")
+    subprocess.run([sys.executable, "-m", "oas_client", *args], check=True)
+
+    modules = sorted(output_dir.rglob("*.py"))
+    formatted = [path for path in modules if is_formatted(path.read_text())]
+    # the test spec fits in the line length, nothing is left for ruff
+    assert formatted == modules
+    res = subprocess.run(
+        ["ruff", "format", "--isolated", "--check", *formatted],
+        capture_output=True,
+        text=True,
+    )
+    assert res.returncode == 0, res.stdout
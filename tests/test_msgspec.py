@@ -0,0 +1,39 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("msgspec")
+
+SPEC = Path(__file__).parent / "spec.json"
+
+
+@pytest.mark.parametrize("split", [False, True], ids=["package", "split-by-tag"])
+def test_generated_client_imports(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, split: bool
+):
+    """
+    msgspec builds the decoders when the client is imported, and rejects
+    a union of several structs, like the location of a server or the
+    responses of core_api_get_server_location
+    """
+    monkeypatch.setenv("OAS_CLIENT_CACHE_DIR", str(tmp_path / "cache"))
+    output_dir = tmp_path / "client"
+    args = [str(SPEC), "--output-dir", str(output_dir), "--mode", "msgspec"]
+    args += ["--no-formatting", "--no-spec-cache"]
+    if split:
+        args.append("--split-by-tag")
+    subprocess.run([sys.executable, "-m", "oas_client", *args], check=True)
+
+    modules = [
+        ".".join(path.relative_to(tmp_path).with_suffix("").parts)
+        for path in sorted(output_dir.rglob("client.py"))
+    ]
+    code = "import importlib\n" + "".join(
+        f"importlib.import_module({module!r})\n" for module in modules
+    )
+    res = subprocess.run(
+        [sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True
+    )
+    assert res.returncode == 0, res.stderr
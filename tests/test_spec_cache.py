@@ -0,0 +1,89 @@
+import json
+import os
+import pickle
+import zlib
+from pathlib import Path
+
+import pytest
+
+from oas_client.openapi import OpenAPI
+from oas_client.spec_cache import SpecCache, load_spec
+
+SPEC = (Path(__file__).parent / "spec.json").read_bytes()
+
+
+@pytest.fixture(scope="module")
+def spec() -> OpenAPI:
+    return OpenAPI(**json.loads(SPEC))
+
+
+def variant(i: int) -> bytes:
+    # the same spec with another hash
+    return SPEC + b" " * i
+
+
+def test_entries_are_keyed_by_the_spec_content(tmp_path: Path, spec: OpenAPI):
+    cache = SpecCache(tmp_path)
+    assert cache.get(SPEC) is None
+    cache.put(SPEC, spec)
+    assert cache.get(SPEC) == spec
+    assert cache.get(variant(1)) is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"not compressed",
+        zlib.compress(b"not a pickle"),
+        zlib.compress(pickle.dumps({"openapi": "3.1.0"}))[:-8],
+    ],
+    ids=["zlib", "pickle", "truncated"],
+)
+def test_corrupt_entries_are_removed(tmp_path: Path, spec: OpenAPI, data: bytes):
+    cache = SpecCache(tmp_path)
+    path = cache.path(SPEC)
+    path.write_bytes(data)
+    assert cache.get(SPEC) is None
+    assert not path.exists()
+    # and written again after validation
+    cache.put(SPEC, spec)
+    assert cache.get(SPEC) == spec
+
+
+def test_entries_of_another_type_are_ignored(tmp_path: Path):
+    cache = SpecCache(tmp_path)
+    cache.path(SPEC).write_bytes(zlib.compress(pickle.dumps({"openapi": "3.1.0"})))
+    assert cache.get(SPEC) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path, spec: OpenAPI):
+    """
+    Reading an entry refreshes its modification time, the oldest ones are
+    removed until the cache fits in max_bytes
+    """
+    cache = SpecCache(tmp_path, max_age=float("inf"))
+    for i in range(3):
+        cache.put(variant(i), spec)
+        os.utime(cache.path(variant(i)), (1_000_000_000 + i, 1_000_000_000 + i))
+    cache.get(variant(0))
+    cache.max_bytes = cache.path(variant(0)).stat().st_size * 2
+    cache.evict()
+    assert [cache.path(variant(i)).exists() for i in range(3)] == [True, False, True]
+
+
+def test_expired_entries_are_evicted(tmp_path: Path, spec: OpenAPI):
+    cache = SpecCache(tmp_path, max_age=60)
+    cache.put(SPEC, spec)
+    cache.put(variant(1), spec)
+    os.utime(cache.path(SPEC), (1_000_000_000, 1_000_000_000))
+    cache.evict()
+    assert not cache.path(SPEC).exists()
+    assert cache.path(variant(1)).exists()
+
+
+def test_load_spec_validates_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OAS_CLIENT_CACHE_DIR", str(tmp_path))
+    spec = load_spec(SPEC)
+    assert len(list((tmp_path / "specs").glob("*.pickle"))) == 1
+    assert load_spec(SPEC) == spec
+    assert load_spec(SPEC, use_cache=False) == spec